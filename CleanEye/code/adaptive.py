@@ -0,0 +1,108 @@
+"""
+CleanEye - Adaptive Resolution Controller
+-----------------------------------------
+Keeps live inference inside a latency budget by walking a ladder of input
+sizes (and, once at the smallest size, a frame stride) based on a moving
+window of measured inference times.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Sequence
+
+DEFAULT_LADDER = (320, 416, 512, 640)
+
+
+class ResolutionController:
+    """Pick the input size and frame stride that fit ``budget_ms`` per frame.
+
+    After every ``window`` inferences the mean inference time, divided by the
+    current stride, is compared with the budget. Above it, the controller
+    steps down the ladder (then raises the stride). When the projected cost
+    of the next richer setting (cost assumed to scale with pixel count) is
+    below ``headroom`` times the budget, it lowers the stride first, then
+    steps back up. Every change is returned from :meth:`observe` and kept
+    in :attr:`changes` for auditing.
+    """
+
+    def __init__(
+        self,
+        target_fps: Optional[float] = None,
+        budget_ms: Optional[float] = None,
+        ladder: Sequence[int] = DEFAULT_LADDER,
+        window: int = 30,
+        max_stride: int = 1,
+        headroom: float = 0.9,
+    ) -> None:
+        if budget_ms is None and not target_fps:
+            raise ValueError("Provide a target FPS or a per-frame latency budget.")
+        self.budget_ms = budget_ms if budget_ms is not None else 1000.0 / float(target_fps)
+        self.ladder = sorted(set(int(size) for size in ladder))
+        self.level = len(self.ladder) - 1
+        self.stride = 1
+        self.max_stride = max(1, max_stride)
+        self.headroom = headroom
+        self.samples: Deque[float] = deque(maxlen=max(1, window))
+        self.changes: List[Dict[str, object]] = []
+
+    @property
+    def imgsz(self) -> int:
+        return self.ladder[self.level]
+
+    def observe(self, inference_ms: float) -> Optional[Dict[str, object]]:
+        """Record one inference time; returns a change record when the setting moves."""
+        self.samples.append(inference_ms)
+        if len(self.samples) < self.samples.maxlen:
+            return None
+
+        mean_ms = sum(self.samples) / len(self.samples)
+        per_frame_ms = mean_ms / self.stride
+        before = (self.imgsz, self.stride)
+        if per_frame_ms > self.budget_ms:
+            if self.level > 0:
+                self.level -= 1
+            elif self.stride < self.max_stride:
+                self.stride += 1
+            reason = "over_budget"
+        else:
+            # Step up only when the projected cost of the next setting still
+            # fits, so the controller does not flap between two rungs.
+            if self.stride > 1:
+                projected_ms = mean_ms / (self.stride - 1)
+            elif self.level < len(self.ladder) - 1:
+                projected_ms = per_frame_ms * (self.ladder[self.level + 1] / self.imgsz) ** 2
+            else:
+                return None
+            if projected_ms >= self.budget_ms * self.headroom:
+                return None
+            if self.stride > 1:
+                self.stride -= 1
+            else:
+                self.level += 1
+            reason = "headroom"
+
+        if (self.imgsz, self.stride) == before:
+            return None
+        self.samples.clear()
+        change = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "mean_inference_ms": round(mean_ms, 2),
+            "budget_ms": round(self.budget_ms, 2),
+            "imgsz": {"from": before[0], "to": self.imgsz},
+            "stride": {"from": before[1], "to": self.stride},
+        }
+        self.changes.append(change)
+        return change
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "imgsz": self.imgsz,
+            "stride": self.stride,
+            "budget_ms": round(self.budget_ms, 2),
+            "ladder": self.ladder,
+            "changes": len(self.changes),
+            "recent_changes": self.changes[-10:],
+        }
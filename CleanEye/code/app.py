@@ -9,37 +9,34 @@ from __future__ import annotations
 
 import json
 import tempfile
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import cv2
-import folium
 import numpy as np
 import streamlit as st
-from geopy.distance import geodesic
-from streamlit.components.v1 import html
+
+from event_store import EVENT_DB_PATH, EventStore
+from inference import detect
+from render import AnnotationRenderer
+from frame_source import VideoSource
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 MODEL_DEFAULT_PATH = ROOT_DIR / "Weights" / "best.pt"
 LOG_SUMMARY_PATH = ROOT_DIR / "outputs" / "logs" / "live_summary.json"
 OUTPUTS_DIR = ROOT_DIR / "outputs"
 
-# Simple color mapping - use raw model labels directly
-COLORS = {
-    "0": (0, 165, 255),           # Orange
-    "c": (255, 215, 0),            # Gold
-    "garbage": (0, 0, 255),        # Red
-    "garbage_bag": (255, 0, 255),  # Magenta
-    "waste": (0, 255, 0),          # Green
-    "trash": (255, 140, 0),        # Dark Orange
-}
-
 
 @st.cache_resource(show_spinner=False)
-def load_model(weights_path: str):
-    from ultralytics import YOLO
+def load_model(weights_path: str, backend: str = "torch", int8: bool = False):
+    """Load (through the compiled-model cache) and warm up once per server process.
 
-    return YOLO(weights_path)
+    Returns the model and its start-up timings.
+    """
+    from backends import load_warm
+
+    return load_warm(Path(weights_path), backend=backend, int8=int8)
 
 
 @st.cache_resource(show_spinner=False)
@@ -65,37 +62,29 @@ def ensure_outputs() -> None:
     OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def annotate_image(model, image: np.ndarray, confidence: float) -> Dict[str, object]:
-    results = model(image, conf=confidence, verbose=False)
-    annotated = image.copy()
-    detections: List[Dict[str, object]] = []
-
-    for box in results[0].boxes:
-        cls_id = int(box.cls[0])
-        conf = float(box.conf[0])
-        raw_label = model.names[cls_id]
-        color = COLORS.get(raw_label, (255, 255, 255))
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-        cv2.putText(
-            annotated,
-            f"{raw_label} {conf:.0%}",
-            (x1, max(25, y1 - 10)),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            color,
-            2,
-            cv2.LINE_AA,
-        )
-
-        detections.append(
-            {
-                "raw_label": raw_label,
-                "label": raw_label,
-                "confidence": conf,
-            }
-        )
+@st.cache_resource(show_spinner=False)
+def load_renderer() -> AnnotationRenderer:
+    """One sprite cache shared by every session."""
+    return AnnotationRenderer()
+
+
+def annotate_image(model, image: np.ndarray, confidence: float, preserve: bool = False) -> Dict[str, object]:
+    """Detect and draw; ``image`` is annotated in place unless ``preserve`` is set.
+
+    A preserved image is drawn on a plain copy, not a buffer from the
+    renderer's pool: the result outlives this call (it is shown and may be
+    saved), so nothing could hand a pooled buffer back.
+    """
+    found = detect(model, image, confidence)
+    annotated = load_renderer().draw(image.copy() if preserve else image, found)
+    detections: List[Dict[str, object]] = [
+        {
+            "raw_label": raw_label,
+            "label": raw_label,
+            "confidence": conf,
+        }
+        for raw_label, conf in zip(found.labels, found.confidence.tolist())
+    ]
 
     return {"image": annotated, "detections": detections}
 
@@ -125,7 +114,7 @@ def handle_image_upload(model, confidence: float, voice_engine) -> None:
         image_bytes = np.asarray(bytearray(uploaded.read()), dtype=np.uint8)
         image = cv2.imdecode(image_bytes, cv2.IMREAD_COLOR)
 
-        result = annotate_image(model, image, confidence)
+        result = annotate_image(model, image, confidence, preserve=True)  # the original is shown alongside
         annotated_rgb = cv2.cvtColor(result["image"], cv2.COLOR_BGR2RGB)
 
     col1, col2 = st.columns(2)
@@ -188,10 +177,10 @@ def handle_video_upload(model, confidence: float, voice_engine) -> None:
         
         **How it works:**
         1. Upload your video file
-        2. Our AI analyzes each frame
+        2. Our AI analyzes frames across the whole clip
         3. Get instant statistics on detected waste
         
-        💡 **Tip:** Shorter videos (under 30 seconds) process faster!
+        💡 **Tip:** Lower "Video samples per second" to skim long videos faster!
         """)
         return
 
@@ -200,12 +189,17 @@ def handle_video_upload(model, confidence: float, voice_engine) -> None:
             tmp_file.write(uploaded.getbuffer())
             temp_path = Path(tmp_file.name)
 
-    cap = cv2.VideoCapture(str(temp_path))
-    if not cap.isOpened():
+    # Time-based sampling covers the whole clip; 0 analyzes every frame up to the frame limit.
+    # Frames are decoded on a background thread while the previous one is being analyzed.
+    source = VideoSource(temp_path, sample_rate=st.session_state.video_sample_rate)
+    if not source.opened:
+        source.release()
         st.error("❌ Unable to open video file. Please try another format.")
         temp_path.unlink(missing_ok=True)
         return
 
+    sampler = source.sampler
+    frame_limit = st.session_state.video_frame_limit if sampler.rate <= 0 else None
     frames_analyzed = 0
     detections_found = 0
     unique_items = set()
@@ -216,11 +210,7 @@ def handle_video_upload(model, confidence: float, voice_engine) -> None:
     stats_placeholder = st.empty()
     
     try:
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-
+        for _, video_seconds, frame in source:
             frames_analyzed += 1
             result = annotate_image(model, frame, confidence)
             
@@ -236,20 +226,21 @@ def handle_video_upload(model, confidence: float, voice_engine) -> None:
             st_frame.image(frame_rgb, use_container_width=True)
             
             # Update progress
-            progress = min(frames_analyzed / st.session_state.video_frame_limit, 1.0)
+            total = frame_limit or sampler.expected
+            progress = min(frames_analyzed / total, 1.0) if total else 0.0
             progress_bar.progress(progress)
             
             # Update stats
             stats_placeholder.metric(
                 "Detections So Far", 
                 detections_found,
-                f"Frame {frames_analyzed}"
+                f"Frame {frames_analyzed} · {video_seconds:.0f}s"
             )
 
-            if frames_analyzed >= st.session_state.video_frame_limit:
+            if frame_limit is not None and frames_analyzed >= frame_limit:
                 break
     finally:
-        cap.release()
+        source.release()
         temp_path.unlink(missing_ok=True)
 
     # Final results
@@ -258,7 +249,7 @@ def handle_video_upload(model, confidence: float, voice_engine) -> None:
     
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("📹 Frames Analyzed", frames_analyzed)
+        st.metric("📹 Frames Analyzed", frames_analyzed, f"{source.seconds:.0f}s of video", delta_color="off")
     with col2:
         st.metric("🗑️ Total Detections", detections_found)
     with col3:
@@ -306,10 +297,11 @@ def render_live_statistics(summary: Optional[Dict[str, object]], voice_engine) -
         help="Total items detected by live detection system"
     )
 
-    if total and st.session_state.voice_enabled and summary != st.session_state.get("last_summary"):
+    # Only a new detection counts; the summary's stats sections change on every rewrite
+    if total and st.session_state.voice_enabled and total != st.session_state.get("last_total_detections"):
         speak(voice_engine, "New garbage detected by live system.")
 
-    st.session_state["last_summary"] = summary
+    st.session_state["last_total_detections"] = total
     
     st.markdown("---")
 
@@ -332,6 +324,8 @@ def render_live_statistics(summary: Optional[Dict[str, object]], voice_engine) -
                 percentage = (count / total * 100) if total > 0 else 0
                 st.write(f"**{label}:** {count} items ({percentage:.1f}%)")
 
+    render_trends(summary.get("trends"))
+
     # Location info
     st.markdown("---")
     location_hint = summary.get("location_hint")
@@ -348,7 +342,77 @@ def render_live_statistics(summary: Optional[Dict[str, object]], voice_engine) -
     st.caption(f"📅 Last updated: {updated}")
 
 
+TREND_WINDOWS = {"Last hour (per minute)": "minute", "Last day (per hour)": "hour"}
+TREND_DIMENSIONS = {"Type": "class", "Category": "category", "Source": "source"}
+
+
+def render_trends(trends: Optional[Dict[str, Dict[str, object]]]) -> None:
+    """Chart the detector's in-memory minute/hour counters straight from the summary."""
+    if not trends:
+        return
+
+    import pandas as pd
+
+    st.markdown("### 📈 Trend")
+    col1, col2 = st.columns(2)
+    with col1:
+        window = TREND_WINDOWS[st.radio("Window", list(TREND_WINDOWS), horizontal=True)]
+    with col2:
+        dimension = TREND_DIMENSIONS[st.radio("Split by", list(TREND_DIMENSIONS), horizontal=True)]
+    data = trends.get(window) or {}
+    series = data.get(dimension) or {}
+    if not series:
+        st.info("No detections in this window yet.")
+        return
+    index = pd.date_range(start=data["start"], periods=data["buckets"], freq=f"{data['bucket_seconds']}s")
+    st.line_chart(pd.DataFrame(series, index=index))
+
+
+HISTORY_WINDOWS = {
+    "Last hour": (timedelta(hours=1), "minute"),
+    "Last 24 hours": (timedelta(days=1), "hour"),
+    "Last 7 days": (timedelta(days=7), "hour"),
+    "All time": (None, "day"),
+}
+
+
+def render_event_history() -> None:
+    """Time-range counts and timeline from the SQLite event store (indexed, no log scan)."""
+    if not EVENT_DB_PATH.exists():
+        return
+
+    import pandas as pd
+
+    st.markdown("---")
+    st.markdown("### 🕒 Detection History")
+    with EventStore(EVENT_DB_PATH, readonly=True) as store:
+        col1, col2 = st.columns(2)
+        with col1:
+            window = st.selectbox("Time range", list(HISTORY_WINDOWS), index=1)
+        with col2:
+            source = st.selectbox("Source", ["All sources"] + store.sources())
+        span, bucket = HISTORY_WINDOWS[window]
+        filters = {
+            "since": datetime.now(timezone.utc) - span if span else None,
+            "source": None if source == "All sources" else source,
+        }
+        st.metric("Objects in range", store.count(**filters))
+        timeline = store.timeline(bucket, **filters)
+        if timeline:
+            st.line_chart(pd.DataFrame(timeline, columns=["Time (UTC)", "Detections"]).set_index("Time (UTC)"))
+        by_label = store.count_by("friendly_label", **filters)
+        if by_label:
+            st.bar_chart(pd.DataFrame(list(by_label.items()), columns=["Type", "Count"]).set_index("Type"))
+        else:
+            st.info("No detections in this time range.")
+
+
 def render_map(latitude: float, longitude: float) -> None:
+    # Map libraries load only once a detection with coordinates is shown
+    import folium
+    from geopy.distance import geodesic
+    from streamlit.components.v1 import html
+
     venue = (24.4181, 54.4583)
     distance = geodesic(venue, (latitude, longitude)).meters
     
@@ -426,9 +490,26 @@ def main() -> None:
                 value=False,
                 help="Hear audio notifications when garbage is detected"
             )
+            backend = st.selectbox(
+                "Inference backend",
+                ["torch", "onnx", "openvino"],
+                help="ONNX Runtime / OpenVINO are usually faster on CPU-only machines",
+            )
+            int8 = st.checkbox(
+                "Int8 model",
+                value=False,
+                disabled=backend == "torch",
+                help="Dynamically quantized weights: faster on CPU, slightly less accurate",
+            )
+            st.session_state.video_sample_rate = st.slider(
+                "Video samples per second",
+                0.0, 10.0, 2.0, 0.5,
+                help="Frames analyzed per second of video; the whole clip is covered. 0 = every frame (up to the limit below)",
+            )
             st.session_state.video_frame_limit = st.slider(
                 "Video frames to analyze", 
                 30, 600, 180, 30,
+                disabled=st.session_state.video_sample_rate > 0,
                 help="More frames = slower but more thorough analysis"
             )
         
@@ -447,7 +528,12 @@ def main() -> None:
 
         weights_path = str(MODEL_DEFAULT_PATH)  # Hidden, use default
 
-    model = load_model(weights_path)
+    model, startup = load_model(weights_path, backend, int8 and backend != "torch")
+    if startup.get("runs"):
+        st.sidebar.caption(
+            f"⏱️ Model {startup['load_ms']:.0f} ms to load (cache {startup['cache']}); "
+            f"first inference {startup['cold_ms']:.0f} ms, warm {startup['warm_ms']:.0f} ms"
+        )
     voice_engine = load_voice_engine() if st.session_state.voice_enabled else None
 
     tabs = st.tabs(["📸 Upload Image", "🎥 Upload Video", "📊 Live Statistics"])
@@ -469,6 +555,7 @@ def main() -> None:
             st.rerun()
         summary = load_detection_summary()
         render_live_statistics(summary, voice_engine)
+        render_event_history()
 
 
 if __name__ == "__main__":
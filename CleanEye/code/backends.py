@@ -0,0 +1,364 @@
+"""
+CleanEye - CPU Inference Backends
+---------------------------------
+Run the detector through PyTorch (Ultralytics), ONNX Runtime or OpenVINO.
+Non-torch backends export ``best.pt`` to ONNX once, cache the file (and an
+optional dynamically quantized int8 copy) next to the weights, and decode
+the raw network output with the NumPy post-processing below, returning the
+same :class:`~inference.Detections` as the torch path.
+
+Load-time artifacts live in ``Weights/cache/``, keyed by weights hash,
+backend and input size: the ONNX Runtime-optimized graph (loaded with graph
+optimizations off), OpenVINO's compiled blobs and, when asked for, a
+TorchScript trace for torch (no model construction or layer fusing on
+load). The trace is opt-in because it serves a fixed square input, while
+``best.pt`` letterboxes each frame to its own rectangle, so boxes can differ
+slightly. :func:`load_warm` loads through that cache and runs a few dummy
+frames so the first real frame does not pay for lazy initialisation.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from batch import weights_hash
+from inference import Detections
+
+BACKENDS = ("torch", "onnx", "openvino")
+DEFAULT_IMGSZ = 640
+DEFAULT_WARMUP_RUNS = 3
+NMS_IOU = 0.7  # Ultralytics predict default
+MAX_DETECTIONS = 300
+_MAX_WH = 7680  # class offset so one NMS pass stays class-aware
+
+
+def cached_onnx_path(weights: Path, imgsz: int, int8: bool) -> Path:
+    suffix = "_int8" if int8 else ""
+    return weights.with_name(f"{weights.stem}_{imgsz}{suffix}.onnx")
+
+
+def model_cache_dir(weights: Path) -> Path:
+    return weights.parent / "cache"
+
+
+def cached_artifact(weights: Path, backend: str, imgsz: int, int8: bool, suffix: str) -> Path:
+    """Cache file for ``weights`` compiled for ``backend`` at ``imgsz``; the name embeds the weights hash."""
+    precision = "_int8" if int8 else ""
+    return model_cache_dir(weights) / f"{weights.stem}_{weights_hash(weights)}_{backend}_{imgsz}{precision}{suffix}"
+
+
+def openvino_cache_dir(weights: Path, imgsz: int, int8: bool) -> Path:
+    """OpenVINO's ``CACHE_DIR`` for this model, so a cache hit can be told from another model's blobs."""
+    return cached_artifact(weights, "openvino", imgsz, int8, "")
+
+
+def _sidecar(model_path: Path) -> Path:
+    return model_path.with_suffix(".json")
+
+
+def _cache_valid(model_path: Path, digest: str) -> bool:
+    if not model_path.exists() or not _sidecar(model_path).exists():
+        return False
+    try:
+        meta = json.loads(_sidecar(model_path).read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return False
+    return meta.get("weights_hash") == digest
+
+
+def export_onnx(weights: Path, imgsz: int = DEFAULT_IMGSZ, int8: bool = False) -> Path:
+    """Export ``weights`` to ONNX (optionally int8) unless a matching cached copy exists."""
+    digest = weights_hash(weights)
+    target = cached_onnx_path(weights, imgsz, int8)
+    if _cache_valid(target, digest):
+        return target
+
+    fp32 = cached_onnx_path(weights, imgsz, False)
+    if not _cache_valid(fp32, digest):
+        from ultralytics import YOLO
+
+        print(f"[INFO] Exporting {weights.name} to ONNX (imgsz={imgsz}) ...")
+        model = YOLO(str(weights))
+        exported = Path(model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True, verbose=False))
+        shutil.move(str(exported), fp32)
+        meta = {"weights_hash": digest, "imgsz": imgsz, "names": {str(k): v for k, v in model.names.items()}}
+        _sidecar(fp32).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"[INFO] Quantizing {fp32.name} to int8 ...")
+        quantize_dynamic(str(fp32), str(target), weight_type=QuantType.QUInt8)
+        shutil.copyfile(_sidecar(fp32), _sidecar(target))
+    return target
+
+
+def trace_torchscript(weights: Path, imgsz: int = DEFAULT_IMGSZ) -> Path:
+    """Trace ``weights`` (fused, inference mode) to TorchScript at a fixed ``imgsz`` unless cached."""
+    target = cached_artifact(weights, "torch", imgsz, False, ".torchscript")
+    if target.exists():
+        return target
+    from ultralytics import YOLO
+
+    print(f"[INFO] Tracing {weights.name} to TorchScript (imgsz={imgsz}) for faster loading ...")
+    exported = Path(YOLO(str(weights)).export(format="torchscript", imgsz=imgsz, verbose=False))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(exported), target)
+    return target
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize keeping aspect ratio and pad to ``size`` x ``size`` (Ultralytics LetterBox, auto=False)."""
+    height, width = image.shape[:2]
+    gain = min(size / height, size / width)
+    new_w, new_h = int(round(width * gain)), int(round(height * gain))
+    pad_w, pad_h = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    padded = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return padded, gain, (left, top)
+
+
+def preprocess(images: Sequence[np.ndarray], size: int) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+    """Letterbox a batch of BGR frames into an NCHW float32 RGB tensor in [0, 1]."""
+    tensors, transforms = [], []
+    for image in images:
+        padded, gain, pad = letterbox(image, size)
+        tensors.append(padded[:, :, ::-1])
+        transforms.append((gain, pad))
+    batch = np.ascontiguousarray(np.stack(tensors).transpose(0, 3, 1, 2), dtype=np.float32)
+    batch *= 1.0 / 255.0
+    return batch, transforms
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy NMS over ``xyxy`` boxes; returns kept indices by descending score."""
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        if len(keep) >= MAX_DETECTIONS:
+            break
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(boxes[best, 2], boxes[rest, 2]) - np.maximum(boxes[best, 0], boxes[rest, 0]), 0, None)
+        inter_h = np.clip(np.minimum(boxes[best, 3], boxes[rest, 3]) - np.maximum(boxes[best, 1], boxes[rest, 1]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def postprocess(
+    output: np.ndarray,
+    shape: Tuple[int, int],
+    transform: Tuple[float, Tuple[int, int]],
+    confidence: float,
+    names: Dict[int, str],
+) -> Detections:
+    """Decode one YOLOv8 head output ``(4 + classes, anchors)`` into frame-space detections."""
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+    mask = scores >= confidence
+    if not mask.any():
+        return Detections.empty(names)
+
+    cxcywh, scores, class_ids = predictions[mask, :4], scores[mask], class_ids[mask]
+    boxes = np.empty_like(cxcywh)
+    boxes[:, :2] = cxcywh[:, :2] - cxcywh[:, 2:] / 2
+    boxes[:, 2:] = cxcywh[:, :2] + cxcywh[:, 2:] / 2
+    keep = nms(boxes + class_ids[:, None] * _MAX_WH, scores, NMS_IOU)
+    boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+    gain, (pad_x, pad_y) = transform
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / gain).clip(0, shape[1])
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / gain).clip(0, shape[0])
+    return Detections(
+        xyxy=np.ascontiguousarray(boxes, dtype=np.int32),
+        confidence=np.ascontiguousarray(scores, dtype=np.float32),
+        class_ids=np.ascontiguousarray(class_ids, dtype=np.int32),
+        names=names,
+    )
+
+
+class ExportedDetector:
+    """Common driver for exported ONNX models; subclasses supply ``_forward``."""
+
+    def __init__(self, model_path: Path) -> None:
+        meta = json.loads(_sidecar(model_path).read_text(encoding="utf-8"))
+        self.model_path = model_path
+        self.imgsz = int(meta.get("imgsz", DEFAULT_IMGSZ))
+        self.names: Dict[int, str] = {int(k): v for k, v in meta["names"].items()}
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def detect_batch(self, images: Sequence[np.ndarray], confidence: float, imgsz: Optional[int] = None) -> List[Detections]:
+        start = time.perf_counter()
+        batch, transforms = preprocess(images, imgsz or self.imgsz)
+        preprocessed = time.perf_counter()
+        outputs = self._forward(batch)
+        forwarded = time.perf_counter()
+        results = [
+            postprocess(output, image.shape[:2], transform, confidence, self.names)
+            for output, image, transform in zip(outputs, images, transforms)
+        ]
+        # Per-image times in ms, matching Ultralytics ``Results.speed``.
+        scale = 1000.0 / max(1, len(results))
+        speed = {
+            "preprocess": (preprocessed - start) * scale,
+            "inference": (forwarded - preprocessed) * scale,
+            "postprocess": (time.perf_counter() - forwarded) * scale,
+        }
+        for detections in results:
+            detections.speed = speed
+        return results
+
+
+class OnnxRuntimeDetector(ExportedDetector):
+    def __init__(self, model_path: Path, threads: int = 0, optimized_path: Optional[Path] = None) -> None:
+        super().__init__(model_path)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        source = model_path
+        if optimized_path is not None and optimized_path.exists():
+            # Already optimized offline for this machine: skip the graph passes
+            source = optimized_path
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        else:
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if optimized_path is not None:
+                optimized_path.parent.mkdir(parents=True, exist_ok=True)
+                options.optimized_model_filepath = str(optimized_path)
+        self.session = ort.InferenceSession(str(source), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoDetector(ExportedDetector):
+    def __init__(self, model_path: Path, threads: int = 0, cache_dir: Optional[Path] = None) -> None:
+        super().__init__(model_path)
+        import openvino as ov
+
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            config["CACHE_DIR"] = str(cache_dir)  # compiled blobs, keyed by OpenVINO on model + config
+        self.compiled = core.compile_model(core.read_model(str(model_path)), "CPU", config)
+
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled(batch)[0]
+
+
+def load_detector(
+    weights: Path,
+    backend: str = "torch",
+    imgsz: int = DEFAULT_IMGSZ,
+    int8: bool = False,
+    threads: int = 0,
+    cache: bool = True,
+    torchscript: bool = False,
+):
+    """Return a model usable with :func:`inference.predict` for ``backend``.
+
+    With ``cache`` the compiled artifacts in :func:`model_cache_dir` are used
+    (and created on the first load). Torch loads ``best.pt`` itself unless
+    ``torchscript`` asks for the cached trace, which only accepts ``imgsz``
+    and letterboxes to a square.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == "torch":
+        from ultralytics import YOLO
+
+        if cache and torchscript:
+            try:
+                return YOLO(str(trace_torchscript(weights, imgsz)), task="detect")
+            except Exception as exc:  # tracing is an optimization; the checkpoint always works
+                print(f"[WARN] TorchScript cache unavailable ({exc}); loading {weights.name} directly.")
+        return YOLO(str(weights))
+
+    model_path = export_onnx(weights, imgsz, int8)
+    if backend == "onnx":
+        optimized = cached_artifact(weights, "onnx", imgsz, int8, ".ort.onnx") if cache else None
+        return OnnxRuntimeDetector(model_path, threads, optimized)
+    return OpenVinoDetector(model_path, threads, openvino_cache_dir(weights, imgsz, int8) if cache else None)
+
+
+def warm_up(model, imgsz: int = DEFAULT_IMGSZ, runs: int = DEFAULT_WARMUP_RUNS) -> Dict[str, float]:
+    """Run ``model`` on ``runs`` blank frames; returns the first (cold) and steady (warm) latency in ms."""
+    from inference import predict
+
+    frame = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    samples = []
+    for _ in range(max(0, runs)):
+        start = time.perf_counter()
+        predict(model, frame, 0.5, imgsz=imgsz)
+        samples.append((time.perf_counter() - start) * 1000)
+    if not samples:
+        return {"runs": 0}
+    warm = sorted(samples[1:])
+    return {
+        "runs": len(samples),
+        "cold_ms": round(samples[0], 2),
+        "warm_ms": round(warm[len(warm) // 2], 2) if warm else round(samples[0], 2),
+    }
+
+
+def load_warm(
+    weights: Path,
+    backend: str = "torch",
+    imgsz: int = DEFAULT_IMGSZ,
+    int8: bool = False,
+    threads: int = 0,
+    cache: bool = True,
+    torchscript: bool = False,
+    warmup_runs: int = DEFAULT_WARMUP_RUNS,
+) -> Tuple[object, Dict[str, object]]:
+    """:func:`load_detector` followed by :func:`warm_up`; returns the model and its start-up timings."""
+    if not cache or (backend == "torch" and not torchscript):
+        state = "off"
+    else:
+        artifact = {
+            "torch": lambda: cached_artifact(weights, "torch", imgsz, False, ".torchscript"),
+            "onnx": lambda: cached_artifact(weights, "onnx", imgsz, int8, ".ort.onnx"),
+            "openvino": lambda: openvino_cache_dir(weights, imgsz, int8),
+        }[backend]()
+        state = "hit" if artifact.exists() and (artifact.is_file() or any(artifact.iterdir())) else "miss"
+    start = time.perf_counter()
+    model = load_detector(weights, backend, imgsz, int8, threads, cache, torchscript)
+    startup: Dict[str, object] = {
+        "backend": backend,
+        "imgsz": imgsz,
+        "cache": state,
+        "load_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    startup.update(warm_up(model, imgsz, warmup_runs))
+    return model, startup
+
+
+def describe_startup(startup: Dict[str, object]) -> str:
+    text = f"loaded in {startup['load_ms']:.0f} ms (cache {startup['cache']})"
+    if startup.get("runs"):
+        text += f", first inference {startup['cold_ms']:.1f} ms, warm {startup['warm_ms']:.1f} ms"
+    return text
@@ -0,0 +1,136 @@
+"""
+CleanEye - Folder Batch Helpers
+-------------------------------
+Image discovery, a resumable manifest and process-pool decoding for the
+``detect_pro.py batch <dir>`` mode. Kept free of the model imports so pool
+workers start quickly.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+MANIFEST_FIELDS = ["key", "path", "mtime_ns", "model_hash", "output", "detections", "class_counts", "processed_at", "status"]
+
+
+def list_images(folder: Path) -> List[Path]:
+    """All images below ``folder``, sorted for a stable processing order."""
+    return sorted(path for path in folder.rglob("*") if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def weights_hash(weights: Path) -> str:
+    """Short SHA-256 of the weights file, used to invalidate results when the model changes.
+
+    Memoized per path, mtime and size, so the model cache and batch mode can
+    ask repeatedly without re-reading the file.
+    """
+    try:
+        stat = weights.stat()
+    except OSError:
+        return _hash_file(str(weights), -1, -1)
+    return _hash_file(str(weights.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    if size >= 0:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(path.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def file_key(path: Path, model_hash: str) -> str:
+    return f"{path.resolve()}|{path.stat().st_mtime_ns}|{model_hash}"
+
+
+class BatchManifest:
+    """Append-only JSONL + CSV record of processed images.
+
+    The JSONL file is the source of truth for resuming: any image whose
+    path+mtime+model-hash key is already listed is skipped on restart.
+    Rows carry a ``status``: ``ok`` once the annotated copy is on disk, or
+    ``unreadable`` for files that could not be decoded (retried only when
+    their mtime changes).
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self.jsonl_path = output_dir / "manifest.jsonl"
+        self.csv_path = output_dir / "manifest.csv"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.done: Set[str] = set()
+        if self.jsonl_path.exists():
+            with self.jsonl_path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        self.done.add(json.loads(line)["key"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue  # tolerate a truncated last line after a crash
+        new_csv = not self.csv_path.exists()
+        self._jsonl = self.jsonl_path.open("a", encoding="utf-8")
+        self._csv_handle = self.csv_path.open("a", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._csv_handle, fieldnames=MANIFEST_FIELDS)
+        if new_csv:
+            self._csv.writeheader()
+
+    def append(self, rows: Iterable[Dict[str, object]]) -> None:
+        for row in rows:
+            self._jsonl.write(json.dumps(row) + "\n")
+            self._csv.writerow({**row, "class_counts": json.dumps(row["class_counts"])})
+            self.done.add(str(row["key"]))
+        self._jsonl.flush()
+        self._csv_handle.flush()
+
+    def close(self) -> None:
+        self._jsonl.close()
+        self._csv_handle.close()
+
+
+def decode_image(job: Tuple[str, int]) -> Tuple[str, Optional[np.ndarray]]:
+    """Pool worker: read an image and shrink it so its longest side is at most ``max_side``."""
+    path, max_side = job
+    image = cv2.imread(path)
+    if image is not None and max_side > 0:
+        scale = max_side / max(image.shape[:2])
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return path, image
+
+
+def iter_decoded(paths: List[Path], workers: int, max_side: int) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+    """Decode ``paths`` in a process pool, yielding results in input order.
+
+    At most a few jobs per worker are in flight, so decoded images never
+    pile up in memory when the model is the slower side. Workers are
+    spawned, not forked: by now the parent runs the model's thread pools
+    and the logger thread, and a forked copy of those can deadlock.
+    """
+    jobs = [(str(path), max_side) for path in paths]
+    if workers <= 1:
+        yield from map(decode_image, jobs)
+        return
+    import multiprocessing  # only batch runs need the pool
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending: Deque[Future] = deque()
+        for job in jobs:
+            pending.append(pool.submit(decode_image, job))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,408 @@
+"""
+CleanEye - Hot-Path Micro-Benchmarks
+------------------------------------
+Times annotation, logging, dashboard and report code paths plus video
+decode loops on synthetic frames, using :class:`FakeDetector` - a stand-in
+with the backend ``detect_batch`` interface that returns the same boxes for
+the same frame every run - so no weights file is needed and results are
+comparable across commits. The ``startup_*`` benchmarks time a fresh
+interpreter running each CLI's ``--help`` (and the launcher quitting) and
+list which heavy libraries that start-up pulled in.
+
+Usage:
+    python code/benchmark.py                        # all benchmarks -> outputs/benchmarks/<time>_<commit>.json
+    python code/benchmark.py --only annotate_frame logger_record
+    python code/benchmark.py --compare outputs/benchmarks/old.json
+    python code/benchmark.py --only startup_detect_pro startup_app
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from inference import Detections
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BENCHMARK_DIR = ROOT_DIR / "outputs" / "benchmarks"
+FAKE_NAMES = {0: "0", 1: "c", 2: "garbage", 3: "garbage_bag", 4: "waste", 5: "trash"}
+HEAVY_MODULES = ("ultralytics", "torch", "onnxruntime", "openvino", "streamlit", "folium", "geopy", "pandas", "multiprocessing", "http.server")
+STARTUP_RUNS = 10  # interpreter launches per startup benchmark at the default --iterations
+STARTUP_TARGETS = {  # name -> (script relative to CleanEye/, argv, stdin)
+    "detect_pro": ("code/detect_pro.py", ["--help"], None),
+    "detect_report": ("code/detect_report.py", ["--help"], None),
+    "test_img": ("code/test_img.py", ["--help"], None),
+    "train": ("code/train.py", ["--help"], None),
+    "event_store": ("code/event_store.py", ["--help"], None),
+    "app": ("code/app.py", None, None),  # module import only: the cost of every Streamlit rerun
+    "launcher": ("start.py", [], "q\n"),
+}
+_STARTUP_DRIVER = """
+import runpy, sys
+from pathlib import Path
+script, argv, heavy = Path(sys.argv[1]), sys.argv[2:], {heavy!r}
+sys.path.insert(0, str(script.parent))
+if argv == ["--import-only"]:
+    __import__(script.stem)
+else:
+    sys.argv = [str(script)] + argv
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+    except SystemExit:
+        pass
+print("\\nHEAVY:" + ",".join(name for name in heavy if name in sys.modules))
+"""
+
+
+class FakeDetector:
+    """Deterministic stand-in for a loaded model.
+
+    Box positions are derived from a cheap checksum of the frame, so the
+    same frame always yields the same ``boxes`` detections, spread across
+    every class in :data:`FAKE_NAMES`.
+    """
+
+    def __init__(self, boxes: int = 8, names: Optional[Dict[int, str]] = None) -> None:
+        self.boxes = boxes
+        self.names = names or dict(FAKE_NAMES)
+
+    def detect_batch(self, images: Sequence[np.ndarray], confidence: float, imgsz: Optional[int] = None) -> List[Detections]:
+        return [self._detect(image, confidence) for image in images]
+
+    def _detect(self, image: np.ndarray, confidence: float) -> Detections:
+        height, width = image.shape[:2]
+        rng = np.random.default_rng(int(image[::97, ::97].sum()))
+        x1 = rng.integers(0, max(1, width - 80), self.boxes)
+        y1 = rng.integers(0, max(1, height - 80), self.boxes)
+        sizes = rng.integers(40, 80, (self.boxes, 2))
+        xyxy = np.stack([x1, y1, x1 + sizes[:, 0], y1 + sizes[:, 1]], axis=1).astype(np.int32)
+        scores = np.linspace(0.95, 0.3, self.boxes, dtype=np.float32)
+        keep = scores >= confidence
+        class_ids = (np.arange(self.boxes) % len(self.names)).astype(np.int32)
+        return Detections(xyxy[keep], scores[keep], class_ids[keep], self.names)
+
+
+def synthetic_frames(count: int, width: int, height: int, seed: int = 0) -> List[np.ndarray]:
+    """Textured frames with a moving bright square, identical for every run."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (0, 0), 3)
+    frames = []
+    for index in range(count):
+        frame = base.copy()
+        x = (index * 17) % max(1, width - 100)
+        cv2.rectangle(frame, (x, height // 3), (x + 100, height // 3 + 100), (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def write_synthetic_video(path: Path, frames: Sequence[np.ndarray], fps: float = 30.0) -> Path:
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def time_calls(fn: Callable[[int], object], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """Call ``fn(i)`` ``iterations`` times after ``warmup`` calls; per-call stats in ms."""
+    for index in range(warmup):
+        fn(index)
+    samples = []
+    for index in range(iterations):
+        start = time.perf_counter()
+        fn(index)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "iterations": iterations,
+        "mean_ms": round(mean, 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "ops_per_sec": round(1000.0 / mean, 2) if mean else 0.0,
+    }
+
+
+class BenchmarkContext:
+    """Shared synthetic inputs and a scratch directory for one run."""
+
+    def __init__(self, workdir: Path, width: int, height: int, boxes: int, frames: int) -> None:
+        self.workdir = workdir
+        self.model = FakeDetector(boxes)
+        self.frames = synthetic_frames(frames, width, height)
+        self.scratch = [frame.copy() for frame in self.frames]  # drawn on in place by the annotation benchmarks
+        self._video: Optional[Path] = None
+
+    @property
+    def video(self) -> Path:
+        if self._video is None:
+            self._video = write_synthetic_video(self.workdir / "synthetic.mp4", self.frames)
+        return self._video
+
+    def frame(self, index: int) -> np.ndarray:
+        return self.frames[index % len(self.frames)]
+
+    def scratch_frame(self, index: int) -> np.ndarray:
+        return self.scratch[index % len(self.scratch)]
+
+
+def _detector(ctx: BenchmarkContext, **kwargs):
+    from detect_pro import DetectionLogger, GarbageDetector
+
+    logger = DetectionLogger(ctx.workdir / "events.jsonl", ctx.workdir / "summary.json")
+    detector = GarbageDetector(logger=logger, **kwargs)
+    detector.model = ctx.model
+    return detector
+
+
+def bench_annotate_frame(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    detector = _detector(ctx)
+    detections = [ctx.model.detect_batch([frame], 0.25)[0] for frame in ctx.frames]
+    try:
+        return time_calls(lambda i: detector._annotate_frame(ctx.scratch_frame(i), detections[i % len(detections)], "bench"), iterations)
+    finally:
+        detector.logger.close()
+
+
+def bench_annotate_frame_tracked(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    from tracking import SortTracker
+
+    detector = _detector(ctx, tracker=SortTracker())
+    detections = [ctx.model.detect_batch([frame], 0.25)[0] for frame in ctx.frames]
+    try:
+        return time_calls(lambda i: detector._annotate_frame(ctx.scratch_frame(i), detections[i % len(detections)], "bench"), iterations)
+    finally:
+        detector.finish()
+        detector.logger.close()
+
+
+def bench_logger_record(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    detector = _detector(ctx)
+    labels = list(FAKE_NAMES.values())
+    events = [detector._make_event("bench", labels[i % len(labels)], 0.5) for i in range(256)]
+    try:
+        return time_calls(lambda i: detector.logger.record(events[i % len(events)]), iterations * 50)
+    finally:
+        detector.logger.close()
+
+
+def bench_app_annotate_image(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    import app
+
+    return time_calls(lambda i: app.annotate_image(ctx.model, ctx.frame(i), 0.25, preserve=True), iterations)
+
+
+def bench_detect_report(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    import detect_report
+
+    image_path = ctx.workdir / "report_input.jpg"
+    cv2.imwrite(str(image_path), ctx.frame(0))
+    detect_report.REPORTS_DIR = ctx.workdir / "reports"  # keep benchmark output out of outputs/reports
+    reporter = detect_report.DetectionReport(Path("fake.pt"))
+    reporter.model = ctx.model
+
+    def run(_: int) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            reporter.generate_report(image_path)
+
+    return time_calls(run, max(1, iterations // 5), warmup=1)
+
+
+def bench_video_decode(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    """Per-frame cost of a plain ``cap.read()`` loop over the synthetic clip."""
+    video = ctx.video
+
+    def run(_: int) -> None:
+        cap = cv2.VideoCapture(str(video))
+        while cap.read()[0]:
+            pass
+        cap.release()
+
+    stats = time_calls(run, max(1, iterations // 10), warmup=1)
+    return _per_frame(stats, len(ctx.frames))
+
+
+def bench_video_detect_loop(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    """Per-frame cost of the dashboard's decode -> detect -> draw loop (decode prefetched by a VideoSource)."""
+    from frame_source import VideoSource
+    from inference import detect, draw_detections
+
+    video = ctx.video
+
+    def run(_: int) -> None:
+        with VideoSource(video) as reader:
+            for frame in reader:
+                draw_detections(frame.image, detect(ctx.model, frame.image, 0.25))
+
+    stats = time_calls(run, max(1, iterations // 10), warmup=1)
+    return _per_frame(stats, len(ctx.frames))
+
+
+def bench_frame_source_handoff(ctx: BenchmarkContext, iterations: int) -> Dict[str, float]:
+    """Per-frame overhead of the prefetch thread and queue, measured on a SyntheticSource."""
+    from frame_source import SyntheticSource
+
+    def run(_: int) -> None:
+        with SyntheticSource(ctx.frames) as reader:
+            for _frame in reader:
+                pass
+
+    stats = time_calls(run, max(1, iterations // 10), warmup=1)
+    return _per_frame(stats, len(ctx.frames))
+
+
+def _startup(target: str) -> Callable[[BenchmarkContext, int], Dict[str, object]]:
+    script, argv, stdin = STARTUP_TARGETS[target]
+    command = [
+        sys.executable,
+        "-c",
+        _STARTUP_DRIVER.format(heavy=HEAVY_MODULES),
+        str(ROOT_DIR / script),
+        *(argv if argv is not None else ["--import-only"]),
+    ]
+
+    def bench(ctx: BenchmarkContext, iterations: int) -> Dict[str, object]:
+        loaded: List[str] = []
+
+        def launch(_: int) -> None:
+            result = subprocess.run(command, cwd=ROOT_DIR, input=stdin, capture_output=True, text=True, timeout=120)
+            marker = result.stdout.rfind("HEAVY:")
+            if result.returncode != 0 or marker < 0:
+                error = (result.stderr.strip().splitlines() or ["no output"])[-1]
+                if "ModuleNotFoundError" in error or "ImportError" in error:
+                    raise ImportError(error)
+                raise RuntimeError(f"{script} failed to start: {error}")
+            loaded[:] = [name for name in result.stdout[marker + 6 :].strip().split(",") if name]
+
+        # Launching interpreters is slow: scale the default 200 iterations down to STARTUP_RUNS
+        stats: Dict[str, object] = dict(time_calls(launch, max(3, iterations * STARTUP_RUNS // 200), warmup=1))
+        stats["heavy_modules"] = loaded
+        return stats
+
+    return bench
+
+
+def _per_frame(stats: Dict[str, float], frames: int) -> Dict[str, float]:
+    per_frame = {key: round(value / frames, 4) for key, value in stats.items() if key.endswith("_ms")}
+    per_frame["iterations"] = stats["iterations"]
+    per_frame["frames_per_iteration"] = frames
+    per_frame["ops_per_sec"] = round(stats["ops_per_sec"] * frames, 2)
+    return per_frame
+
+
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext, int], Dict[str, float]]] = {
+    "annotate_frame": bench_annotate_frame,
+    "annotate_frame_tracked": bench_annotate_frame_tracked,
+    "logger_record": bench_logger_record,
+    "app_annotate_image": bench_app_annotate_image,
+    "detect_report": bench_detect_report,
+    "video_decode": bench_video_decode,
+    "video_detect_loop": bench_video_detect_loop,
+    "frame_source_handoff": bench_frame_source_handoff,
+    **{f"startup_{target}": _startup(target) for target in STARTUP_TARGETS},
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def compare(current: Dict[str, object], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\n[INFO] Compared with {baseline_path.name} (commit {baseline.get('commit')}); mean ms, lower is better")
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not isinstance(stats, dict) or "mean_ms" not in stats or not before or "mean_ms" not in before:
+            continue
+        change = (stats["mean_ms"] - before["mean_ms"]) / before["mean_ms"] * 100 if before["mean_ms"] else 0.0
+        print(f"  {name:<24} {before['mean_ms']:>10.4f} -> {stats['mean_ms']:>10.4f}  ({change:+.1f}%)")
+
+
+def run(names: Sequence[str], iterations: int, width: int, height: int, boxes: int, frames: int) -> Dict[str, object]:
+    results: Dict[str, object] = {}
+    with tempfile.TemporaryDirectory(prefix="cleaneye-bench-") as tmp:
+        ctx = BenchmarkContext(Path(tmp), width, height, boxes, frames)
+        for name in names:
+            try:
+                stats = BENCHMARKS[name](ctx, iterations)
+            except (ImportError, SystemExit) as exc:
+                # detect_pro/app/detect_report need their runtime dependencies installed
+                reason = str(exc) if isinstance(exc, ImportError) else "runtime dependencies missing"
+                results[name] = {"skipped": reason}
+                print(f"[WARN] {name}: skipped ({reason})")
+                continue
+            results[name] = stats
+            heavy = f"  [loads {', '.join(stats['heavy_modules']) or 'nothing heavy'}]" if "heavy_modules" in stats else ""
+            print(f"[OK] {name:<24} mean {stats['mean_ms']:.4f} ms  p95 {stats['p95_ms']:.4f} ms  ({stats['ops_per_sec']:.1f}/s){heavy}")
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "environment": environment(),
+        "config": {"iterations": iterations, "width": width, "height": height, "boxes": boxes, "frames": frames},
+        "results": results,
+    }
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="CleanEye - hot-path micro-benchmarks",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run just these benchmarks")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per benchmark")
+    parser.add_argument("--width", type=int, default=1280, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=720, help="Synthetic frame height")
+    parser.add_argument("--boxes", type=int, default=8, help="Detections per frame from the fake model")
+    parser.add_argument("--frames", type=int, default=60, help="Synthetic frames (and video length)")
+    parser.add_argument("--output", help="Result file (default: outputs/benchmarks/<time>_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to diff against")
+    args = parser.parse_args(argv)
+
+    report = run(args.only or list(BENCHMARKS), args.iterations, args.width, args.height, args.boxes, args.frames)
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        output = BENCHMARK_DIR / f"{stamp}_{report['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[OK] Results written to {output}")
+    if args.compare:
+        compare(report, Path(args.compare))
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
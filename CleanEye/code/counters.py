@@ -0,0 +1,92 @@
+"""
+CleanEye - Time-Bucketed Counters
+---------------------------------
+Ring buffers of per-minute and per-hour counts for each class, category and
+source. Every event costs O(1): a slot whose bucket has gone stale is reset
+lazily when it is next written, and stale slots read as zero. The
+serialised form (dense count lists aligned to a common start time) goes
+straight into ``live_summary.json`` for the dashboard's trend charts.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DIMENSIONS = ("class", "category", "source")
+WINDOWS = {"minute": (60, 60), "hour": (3600, 24)}  # name -> (bucket seconds, buckets kept)
+
+
+class RingCounter:
+    """Counts per key over the last ``size`` buckets of ``width`` seconds."""
+
+    def __init__(self, width: int, size: int) -> None:
+        self.width = width
+        self.size = size
+        self._counts: Dict[str, List[int]] = {}
+        self._buckets: Dict[str, List[int]] = {}  # bucket number held by each slot
+
+    def add(self, key: str, now: float, amount: int = 1) -> None:
+        bucket = int(now // self.width)
+        slot = bucket % self.size
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * self.size
+            self._buckets[key] = [-1] * self.size
+        buckets = self._buckets[key]
+        if buckets[slot] != bucket:
+            buckets[slot] = bucket
+            counts[slot] = 0
+        counts[slot] += amount
+
+    def series(self, now: float) -> Dict[str, List[int]]:
+        """Oldest-first counts for the window ending with the current bucket; idle keys are omitted."""
+        last = int(now // self.width)
+        first = last - self.size + 1
+        result = {}
+        for key, counts in self._counts.items():
+            buckets = self._buckets[key]
+            values = [
+                counts[bucket % self.size] if buckets[bucket % self.size] == bucket else 0
+                for bucket in range(first, last + 1)
+            ]
+            if any(values):
+                result[key] = values
+        return result
+
+    def start(self, now: float) -> float:
+        return (int(now // self.width) - self.size + 1) * self.width
+
+
+class TimeBucketCounters:
+    """Per-minute and per-hour :class:`RingCounter` for every dimension."""
+
+    def __init__(self) -> None:
+        self.rings = {
+            window: {dimension: RingCounter(width, size) for dimension in DIMENSIONS}
+            for window, (width, size) in WINDOWS.items()
+        }
+
+    def add(self, label: str, category: str, source: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for rings in self.rings.values():
+            rings["class"].add(label, now)
+            rings["category"].add(category, now)
+            rings["source"].add(source, now)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, object]]:
+        """``{window: {start, bucket_seconds, buckets, class: {...}, category: {...}, source: {...}}}``."""
+        now = time.time() if now is None else now
+        result: Dict[str, Dict[str, object]] = {}
+        for window, rings in self.rings.items():
+            sample = rings["class"]
+            entry: Dict[str, object] = {
+                "start": datetime.fromtimestamp(sample.start(now), timezone.utc).isoformat(),
+                "bucket_seconds": sample.width,
+                "buckets": sample.size,
+            }
+            for dimension, ring in rings.items():
+                entry[dimension] = ring.series(now)
+            result[window] = entry
+        return result
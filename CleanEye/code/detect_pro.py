@@ -8,26 +8,45 @@ results for the Streamlit dashboard.
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
 import os
+import queue
+import re
+import signal
 import sys
+import threading
 import time
 from collections import defaultdict, deque
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from random import uniform
-from typing import Deque, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
 
-try:
-    from ultralytics import YOLO
-except ImportError as exc:  # pragma: no cover - handled by CLI
-    print("Ultralytics is required. Install with `pip install ultralytics`.", file=sys.stderr)
-    raise SystemExit(1) from exc
+from adaptive import DEFAULT_LADDER, ResolutionController
+from backends import BACKENDS, DEFAULT_IMGSZ, DEFAULT_WARMUP_RUNS, describe_startup, export_onnx, load_detector, load_warm
+from batch import BatchManifest, file_key, iter_decoded, list_images, weights_hash
+from counters import TimeBucketCounters
+from event_store import EVENT_DB_PATH, EventStore
+from frame_source import VideoSource
+from inference import Detections, predict
+from metrics import MetricsServer, StageMetrics
+from motion import MotionGate
+from pipeline import OVERFLOW_POLICIES, FrameQueue, StageThread
+from recorder import DEFAULT_CODEC, VideoRecorder
+from render import AnnotationRenderer
+from roi import RegionOfInterest, load_roi_config, roi_for
+from sampling import describe_sampling
+from snapshots import SnapshotWriter
+from tracking import SortTracker, Track
 
+if TYPE_CHECKING:
+    from streaming import MjpegServer
 
 ROOT_DIR = Path(__file__).resolve().parent.parent  # CleanEye directory (go up from code/)
 MODEL_PATH = ROOT_DIR / "Weights" / "best.pt"
@@ -35,20 +54,14 @@ OUTPUT_DIR = ROOT_DIR / "outputs"
 LOG_DIR = OUTPUT_DIR / "logs"
 SNAPSHOT_DIR = OUTPUT_DIR / "snapshots"
 AUTO_SAVE_DIR = OUTPUT_DIR / "auto_saves"
+RECORDING_DIR = OUTPUT_DIR / "recordings"
+BENCHMARK_DIR = OUTPUT_DIR / "benchmarks"
 LOG_FILE = LOG_DIR / "live_detections.jsonl"
 SUMMARY_FILE = LOG_DIR / "live_summary.json"
+ADAPTIVE_LOG_FILE = LOG_DIR / "resolution_changes.jsonl"
+ROI_CONFIG = ROOT_DIR / "config" / "roi.json"
 BOOTH_COORDINATES = (24.4181, 54.4583)  # ADIPEC venue (approximate latitude, longitude)
 
-# Simple color mapping - use raw model labels directly
-COLORS = {
-    "0": (0, 165, 255),           # Orange
-    "c": (255, 215, 0),            # Gold
-    "garbage": (0, 0, 255),        # Red
-    "garbage_bag": (255, 0, 255),  # Magenta
-    "waste": (0, 255, 0),          # Green
-    "trash": (255, 140, 0),        # Dark Orange
-}
-
 # Category mapping for statistics only
 CATEGORIES = {
     "0": "General",
@@ -62,7 +75,7 @@ CATEGORIES = {
 
 def ensure_directories() -> None:
     """Create required output folders."""
-    for path in (OUTPUT_DIR, LOG_DIR, SNAPSHOT_DIR, AUTO_SAVE_DIR):
+    for path in (OUTPUT_DIR, LOG_DIR, SNAPSHOT_DIR, AUTO_SAVE_DIR, RECORDING_DIR):
         path.mkdir(parents=True, exist_ok=True)
 
 
@@ -91,40 +104,193 @@ class DetectionEvent:
     confidence: float
     latitude: float
     longitude: float
+    event: str = "detection"  # detection | track_start | track_end
+    track_id: Optional[int] = None
+    duration_frames: Optional[int] = None
+
+
+@dataclass
+class StreamState:
+    """One input of the multi-stream detector."""
+
+    name: str
+    source: Union[int, Path]
+    reader: VideoSource
+    inferred: int = 0
+    recorder: Optional[VideoRecorder] = None
+    motion_gate: Optional[MotionGate] = None
+    last_detections: Detections = field(default_factory=Detections.empty)
 
 
 class DetectionLogger:
-    """Persist detection events and maintain live summaries for the dashboard."""
+    """Persist detection events and maintain live summaries for the dashboard.
 
-    def __init__(self, logfile: Path = LOG_FILE, summary_file: Path = SUMMARY_FILE) -> None:
+    ``record`` only updates in-memory counters and queues the event; a
+    background writer stores queued events in batches (every
+    ``flush_events`` events or ``flush_interval`` seconds) - in the SQLite
+    ``store`` when one is given (the logger then owns and closes it),
+    otherwise appended to the JSONL log - and
+    rewrites the summary at most every ``summary_interval_ms`` via a temp
+    file plus rename, so readers never see a half-written summary. Sections
+    attached with ``publish`` (runtime stats that change all the time) do not
+    trigger a rewrite on their own; they ride along with the next one, or go
+    out every ``section_interval`` seconds when no events arrive. Call
+    ``close`` (or use the logger as a context manager) to flush on shutdown.
+    """
+
+    def __init__(
+        self,
+        logfile: Path = LOG_FILE,
+        summary_file: Path = SUMMARY_FILE,
+        flush_events: int = 256,
+        flush_interval: float = 1.0,
+        summary_interval_ms: int = 500,
+        store: Optional[EventStore] = None,
+        section_interval: float = 5.0,
+    ) -> None:
         self.logfile = logfile
+        self.store = store
         self.summary_file = summary_file
+        self.flush_events = max(1, flush_events)
+        self.flush_interval = flush_interval
+        self.summary_interval = summary_interval_ms / 1000.0
+        self.section_interval = max(self.summary_interval, section_interval)
         self.class_counts: Dict[str, int] = defaultdict(int)
         self.category_counts: Dict[str, int] = defaultdict(int)
+        self.trends = TimeBucketCounters()
         self.total_events = 0
         self.last_event: Optional[DetectionEvent] = None
+        self.write_stats: Dict[str, float] = {
+            "events_written": 0,
+            "event_writes": 0,
+            "summary_writes": 0,
+            "last_write_ms": 0.0,
+            "max_write_ms": 0.0,
+            "total_write_ms": 0.0,
+        }
+        self.sections: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[DetectionEvent]]" = queue.Queue()
+        self._dirty = False
+        self._sections_dirty = False
+        self._closed = False
         ensure_directories()
+        self._writer = threading.Thread(target=self._writer_loop, name="cleaneye-logger", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "DetectionLogger":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def record(self, event: DetectionEvent) -> None:
-        self.total_events += 1
-        self.class_counts[event.friendly_label] += 1
-        self.category_counts[event.category] += 1
-        self.last_event = event
-
-        with self.logfile.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(event.__dict__) + "\n")
-
-        summary = {
-            "updated_at": event.timestamp,
-            "total_detections": self.total_events,
-            "class_counts": dict(self.class_counts),
-            "category_counts": dict(self.category_counts),
-            "last_event": event.__dict__,
-            "location_hint": {"latitude": event.latitude, "longitude": event.longitude},
-        }
+        with self._lock:
+            # A track_end closes an object that was already counted at track_start
+            if event.event != "track_end":
+                self.total_events += 1
+                self.class_counts[event.friendly_label] += 1
+                self.category_counts[event.category] += 1
+                self.trends.add(event.friendly_label, event.category, event.source)
+                self.last_event = event
+            self._dirty = True
+        self._queue.put(event)
 
-        with self.summary_file.open("w", encoding="utf-8") as handle:
-            json.dump(summary, handle, indent=2)
+    def publish(self, section: str, values: object) -> None:
+        """Attach ``values`` to the summary under ``section`` on the next write (see the class docstring)."""
+        with self._lock:
+            self.sections[section] = values
+            self._sections_dirty = True
+
+    def close(self) -> None:
+        """Flush pending events and the final summary, then stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> Dict[str, float]:
+        stats = dict(self.write_stats)
+        writes = stats["event_writes"] + stats["summary_writes"]
+        stats["avg_write_ms"] = stats["total_write_ms"] / writes if writes else 0.0
+        stats["pending_events"] = self._queue.qsize()
+        return stats
+
+    def _writer_loop(self) -> None:
+        pending: list = []
+        last_flush = time.monotonic()
+        last_summary = 0.0
+        poll = max(0.05, min(self.flush_interval, self.summary_interval))
+        running = True
+        while running:
+            try:
+                event = self._queue.get(timeout=poll)
+                if event is None:
+                    running = False
+                else:
+                    pending.append(event)
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            if pending and (not running or len(pending) >= self.flush_events or now - last_flush >= self.flush_interval):
+                self._write_events(pending)
+                pending = []
+                last_flush = now
+            since_summary = now - last_summary
+            if (self._dirty and (not running or since_summary >= self.summary_interval)) or (
+                self._sections_dirty and (not running or since_summary >= self.section_interval)
+            ):
+                self._write_summary()
+                last_summary = now
+
+    def _timed_write(self, key: str, write) -> None:
+        start = time.perf_counter()
+        write()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.write_stats[key] += 1
+        self.write_stats["last_write_ms"] = elapsed_ms
+        self.write_stats["max_write_ms"] = max(self.write_stats["max_write_ms"], elapsed_ms)
+        self.write_stats["total_write_ms"] += elapsed_ms
+
+    def _write_events(self, events: list) -> None:
+        def write() -> None:
+            if self.store is not None:
+                self.store.insert(event.__dict__ for event in events)
+                return
+            with self.logfile.open("a", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(event.__dict__) + "\n" for event in events))
+
+        self._timed_write("event_writes", write)
+        self.write_stats["events_written"] += len(events)
+
+    def _write_summary(self) -> None:
+        with self._lock:
+            event = self.last_event
+            summary = {
+                "updated_at": event.timestamp if event else datetime.now(timezone.utc).isoformat(),
+                "total_detections": self.total_events,
+                "class_counts": dict(self.class_counts),
+                "category_counts": dict(self.category_counts),
+                "trends": self.trends.snapshot(),
+                "last_event": event.__dict__ if event else None,
+                "location_hint": {"latitude": event.latitude, "longitude": event.longitude} if event else None,
+            }
+            summary["event_log"] = str(self.store.path if self.store is not None else self.logfile)
+            summary.update(self.sections)
+            self._dirty = self._sections_dirty = False
+        summary["logger"] = self.stats()
+
+        def write() -> None:
+            tmp_path = self.summary_file.with_name(self.summary_file.name + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(summary, handle, separators=(",", ":"))
+            os.replace(tmp_path, self.summary_file)
+
+        self._timed_write("summary_writes", write)
 
 
 class GarbageDetector:
@@ -136,116 +302,410 @@ class GarbageDetector:
         confidence: float = 0.25,  # Lower default for better detection
         auto_save: bool = False,
         logger: Optional[DetectionLogger] = None,
+        motion_gate: Optional[MotionGate] = None,
+        tracker: Optional[SortTracker] = None,
+        detect_every: int = 1,
+        backend: str = "torch",
+        imgsz: int = DEFAULT_IMGSZ,
+        int8: bool = False,
+        rois: Optional[Dict[str, RegionOfInterest]] = None,
+        resolution: Optional[ResolutionController] = None,
+        headless: bool = False,
+        record: bool = False,
+        codec: str = DEFAULT_CODEC,
+        record_queue: int = 64,
+        streamer: Optional[MjpegServer] = None,
+        snapshots: Optional[SnapshotWriter] = None,
+        model_cache: bool = True,
+        torchscript: bool = False,
+        warmup_runs: int = DEFAULT_WARMUP_RUNS,
     ) -> None:
         self.model_path = model_path
+        self.backend = backend
+        self.imgsz = imgsz
+        self.int8 = int8
+        self.model_cache = model_cache
+        self.torchscript = torchscript
+        self.warmup_runs = warmup_runs
+        self.startup: Dict[str, object] = {}
+        self.rois = rois or {}
+        self.resolution = resolution
+        self.headless = headless
+        self.record = record or headless  # headless runs always keep the annotated video
+        self.codec = codec
+        self.record_queue = record_queue
+        self.streamer = streamer
         self.confidence = confidence
         self.auto_save = auto_save
+        self.snapshots = snapshots
+        if auto_save and snapshots is None:
+            self.snapshots = SnapshotWriter(AUTO_SAVE_DIR)
         self.logger = logger or DetectionLogger()
-        self.model: Optional[YOLO] = None
+        self.motion_gate = motion_gate
+        self.tracker = tracker
+        self._trackers: Dict[str, SortTracker] = {}
+        self.detect_every = max(1, detect_every) if tracker is not None else 1
+        self.model = None  # YOLO, or an exported runtime from backends.load_detector
+        self.renderer = AnnotationRenderer()
         self.frame_history: Deque[float] = deque(maxlen=120)
         self.total_frames = 0
         self.total_detections = 0
+        self.last_inference_ms = 0.0
+        self._last_detections = Detections.empty()
+        self.metrics = StageMetrics()
+        self._metrics_published = 0.0
+
+    def load_model(self, dynamic: bool = False) -> bool:
+        """Load the model through the configured backend and model cache, then warm it up.
 
-    def load_model(self) -> bool:
-        """Load YOLO model from disk."""
+        ``dynamic`` (implied by adaptive resolution) means frames are inferred
+        at other sizes than ``imgsz``, which the torch trace cannot do, so
+        ``best.pt`` is loaded even when ``torchscript`` was asked for.
+        """
+        dynamic = dynamic or self.resolution is not None
+        if self.torchscript and dynamic and self.backend == "torch":
+            print("[WARN] --torchscript needs a fixed input size; loading best.pt for adaptive resolution / multi-size bench.")
         try:
-            self.model = YOLO(str(self.model_path))
-            print("[OK] Model loaded.")
+            self.model, self.startup = load_warm(
+                self.model_path,
+                self.backend,
+                self.imgsz,
+                self.int8,
+                cache=self.model_cache,
+                torchscript=self.torchscript and not dynamic,
+                warmup_runs=self.warmup_runs,
+            )
+            print(
+                f"[OK] Model {describe_startup(self.startup)} "
+                f"({self.backend}{', int8' if self.int8 and self.backend != 'torch' else ''})."
+            )
+            self.logger.publish("startup", dict(self.startup))
             return True
+        except ImportError as exc:  # runtimes are imported on first load, not at startup
+            print(f"[ERROR] {exc}. Install with `pip install ultralytics` (plus onnxruntime/openvino for those backends).")
+            return False
         except Exception as exc:  # pragma: no cover - runtime guard
             print(f"[ERROR] Failed to load model: {exc}")
             return False
 
-    def _annotate_frame(self, frame: np.ndarray, result, source: str) -> Tuple[np.ndarray, int]:
-        annotated = frame.copy()
-        detections = 0
-
-        for box in result.boxes:
-            detections += 1
-            cls_id = int(box.cls[0])
-            conf = float(box.conf[0])
-            raw_label = self.model.names[cls_id] if self.model else str(cls_id)
-            color = COLORS.get(raw_label, (255, 255, 255))
-            category = CATEGORIES.get(raw_label, "Unknown")
-
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-            label_text = f"{raw_label} {conf:.0%}"
+    def _predict(self, images, sources: Union[str, Sequence[str]] = "*") -> List[Detections]:
+        """Run the model on one frame or a list of frames.
+
+        Frames whose source has a region of interest are cropped to it before
+        inference and their boxes mapped back (and filtered) afterwards.
+        """
+        # Always explicit: a torch checkpoint would otherwise infer at Ultralytics' default size
+        kwargs = {"imgsz": self.resolution.imgsz if self.resolution is not None else self.imgsz}
+        if not self.rois:
+            return self._timed_predict(images, kwargs)
+
+        frames = images if isinstance(images, list) else [images]
+        names = [sources] * len(frames) if isinstance(sources, str) else list(sources)
+        regions = [roi_for(self.rois, name) for name in names]
+        inputs = [region.crop(frame) if region else frame for frame, region in zip(frames, regions)]
+        results = self._timed_predict(inputs if isinstance(images, list) else inputs[0], kwargs)
+        return [
+            region.restore(detections, frame.shape[:2]) if region else detections
+            for frame, region, detections in zip(frames, regions, results)
+        ]
+
+    def _timed_predict(self, images, kwargs: Dict[str, int]) -> List[Detections]:
+        """Call the model and feed its per-image stage times into the latency histograms.
+
+        Runtimes that do not report ``speed`` get the whole call, split per
+        image, booked as ``inference``.
+        """
+        start = time.perf_counter()
+        results = predict(self.model, images, self.confidence, **kwargs)
+        per_image_ms = (time.perf_counter() - start) * 1000 / max(1, len(results))
+        if self.startup and "first_frame_ms" not in self.startup:
+            self.startup["first_frame_ms"] = round(per_image_ms, 2)  # compare with the warm-up's cold_ms/warm_ms
+            self.logger.publish("startup", dict(self.startup))
+        for detections in results:
+            for stage, value_ms in (detections.speed or {"inference": per_image_ms}).items():
+                self.metrics.observe(stage, value_ms)
+        return results
+
+    def _make_event(self, source: str, raw_label: str, conf: float, **extra) -> DetectionEvent:
+        return DetectionEvent(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            source=source,
+            frame_index=self.total_frames,
+            raw_label=raw_label,
+            friendly_label=raw_label,
+            category=CATEGORIES.get(raw_label, "Unknown"),
+            confidence=conf,
+            latitude=BOOTH_COORDINATES[0] + uniform(-0.0008, 0.0008),
+            longitude=BOOTH_COORDINATES[1] + uniform(-0.0008, 0.0008),
+            **extra,
+        )
+
+    def _log_ended_tracks(self, tracks: List[Track]) -> None:
+        for track in tracks:
+            self.logger.record(
+                self._make_event(
+                    track.source,
+                    track.label,
+                    track.max_confidence,
+                    event="track_end",
+                    track_id=track.track_id,
+                    duration_frames=track.last_frame - track.first_frame + 1,
+                )
+            )
+
+    def _annotate_frame(self, frame: np.ndarray, detections: Detections, source: str) -> Tuple[np.ndarray, int]:
+        """Draw and log ``detections``; returns the annotated frame and the number of new objects.
+
+        Without a tracker every box is logged. With one, only tracks that were
+        just confirmed are logged (plus a ``track_end`` when they disappear).
+        ``frame`` is drawn on in place; when there are new objects it is first
+        offered to the auto-save writer, which keeps a pooled copy of the raw
+        frame if it accepts it.
+        """
+        tracker = self._tracker_for(source)
+        update = None
+        if tracker is not None:
+            with self.metrics.time("tracking"):
+                update = tracker.update(detections, self.total_frames, source)
+
+        detected = len(update.started) if update is not None else len(detections)
+        if self.snapshots is not None and detected > 0:
+            track_ids = update.active.track_ids if update is not None else None
+            self.snapshots.submit(frame, track_ids, pool=self.renderer.pool, source=source)
+
+        with self.metrics.time("annotate"):
+            self._redraw(frame, update.active if update is not None else detections, source)
+
+        with self.metrics.time("logging"):
+            if update is not None:
+                for track in update.started:
+                    self.logger.record(
+                        self._make_event(source, track.label, track.confidence, event="track_start", track_id=track.track_id)
+                    )
+                self._log_ended_tracks(update.ended)
+            else:
+                self._log_boxes(detections, source)
+        self.publish_metrics()
+        return frame, detected
+
+    def _redraw(self, frame: np.ndarray, detections: Detections, source: str) -> np.ndarray:
+        """Draw the source's ROI outline and ``detections`` in place, whether or not the model ran on ``frame``."""
+        region = roi_for(self.rois, source) if self.rois else None
+        if region is not None:
+            region.draw(frame)
+        return self.renderer.draw(frame, detections)
+
+    def _log_boxes(self, detections: Detections, source: str) -> None:
+        for raw_label, conf, _ in detections.rows():
+            self.logger.record(self._make_event(source, raw_label, conf))
+
+    def _tracker_for(self, source: str) -> Optional[SortTracker]:
+        """Each source gets its own tracker; the configured one serves the first."""
+        if self.tracker is None:
+            return None
+        if source not in self._trackers:
+            template = self.tracker
+            self._trackers[source] = template if not self._trackers else SortTracker(
+                template.iou_threshold, template.max_age, template.min_hits
+            )
+        return self._trackers[source]
+
+    def finish(self) -> None:
+        """Close open tracks (so their ``track_end`` events reach the log) and flush auto-saves."""
+        for tracker in self._trackers.values():
+            self._log_ended_tracks(tracker.finish())
+        if self.snapshots is not None:
+            self.snapshots.close()
+            stats = self.snapshots.stats()
+            self.logger.publish("auto_save", stats)
+            print(
+                f"[INFO] Auto-save: {stats['saved']} saved, {stats['rate_limited']} rate limited, "
+                f"{stats['dropped']} dropped (queue full), {stats['failed']} failed"
+            )
+        self.publish_metrics(force=True)
+
+    def publish_metrics(self, force: bool = False) -> None:
+        """Copy the stage latency percentiles into the live summary.
+
+        Runs at most once per logger ``section_interval``: these numbers change
+        on every frame, so they are published as a stats section, which never
+        triggers a summary rewrite (and a dashboard alert) on its own.
+        """
+        now = time.monotonic()
+        if not force and now - self._metrics_published < self.logger.section_interval:
+            return
+        self._metrics_published = now
+        self.logger.publish("stage_latency", self.metrics.snapshot())
+        self.logger.publish("renderer", self.renderer.stats())
+
+    def metrics_text(self) -> str:
+        """Prometheus exposition for the ``/metrics`` endpoint."""
+        fps = self.frame_history[-1] if self.frame_history else 0.0
+        return self.metrics.prometheus(
+            {
+                "frames": self.total_frames,
+                "detections": self.total_detections,
+                "last_inference_ms": round(self.last_inference_ms, 3),
+                "fps": round(fps, 3),
+                "model_load_ms": self.startup.get("load_ms", 0.0),
+                "warmup_cold_ms": self.startup.get("cold_ms", 0.0),
+                "warmup_warm_ms": self.startup.get("warm_ms", 0.0),
+            }
+        )
+
+    def _process_frame(self, frame: np.ndarray, source: str) -> Tuple[np.ndarray, int]:
+        """Infer, annotate and log one live frame.
+
+        When a motion gate is configured and the scene has not changed, the
+        model is skipped and the previous detections are drawn again without
+        being logged a second time. Returns the annotated frame and the number
+        of newly logged detections.
+        """
+        self.total_frames += 1
+        if self.motion_gate is not None:
+            inferred = self.motion_gate.should_infer(frame)
+            self.logger.publish("motion_gate", self.motion_gate.stats())
+            if not inferred:
+                return self._redraw(frame, self._last_detections, source), 0
+
+        tracker = self._tracker_for(source)
+        stride = max(self.detect_every, self.resolution.stride if self.resolution is not None else 1)
+        if (self.total_frames - 1) % stride:
+            if tracker is not None:
+                self._last_detections = tracker.predict()
+            return self._redraw(frame, self._last_detections, source), 0
+
+        inference_start = time.time()
+        detections = self._predict(frame, source)[0]
+        self.last_inference_ms = (time.time() - inference_start) * 1000
+        if self.resolution is not None:
+            change = self.resolution.observe(self.last_inference_ms)
+            if change is not None:
+                self._record_resolution_change(change)
+        annotated, detected = self._annotate_frame(frame, detections, source=source)
+        self._last_detections = tracker.active() if tracker is not None else detections
+        self.total_detections += detected
+        return annotated, detected
+
+    def _record_resolution_change(self, change: Dict[str, object]) -> None:
+        print(
+            f"[ADAPT] imgsz {change['imgsz']['from']} -> {change['imgsz']['to']}, "
+            f"stride {change['stride']['from']} -> {change['stride']['to']} "
+            f"({change['reason']}: {change['mean_inference_ms']} ms vs {change['budget_ms']} ms budget)"
+        )
+        with ADAPTIVE_LOG_FILE.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(change) + "\n")
+        self.logger.publish("resolution_controller", self.resolution.stats())
+
+    def _overlay_lines(self, fps: float) -> List[str]:
+        lines = [
+            f"Frames: {self.total_frames} | Detections: {self.total_detections} | "
+            f"Inference: {self.last_inference_ms:.1f} ms | FPS: {fps:.1f}"
+        ]
+        if self.motion_gate is not None:
+            stats = self.motion_gate.stats()
+            lines.append(
+                f"Inferred: {stats['inferred_frames']} | Skipped: {stats['skipped_frames']} | "
+                f"Change: {stats['last_change']:.1%}"
+            )
+        if self.resolution is not None:
+            lines.append(
+                f"Input: {self.resolution.imgsz}px | Stride: {self.resolution.stride} | "
+                f"Budget: {self.resolution.budget_ms:.1f} ms"
+            )
+        return lines
+
+    def _open_recorder(self, fps: float, label: str, live: bool) -> Optional[VideoRecorder]:
+        """Start an encoder for ``label`` at the source's ``fps`` when recording is enabled.
+
+        Live sources drop frames when the encoder falls behind; files wait for
+        it so the recording keeps every frame.
+        """
+        if not self.record:
+            return None
+        stem = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or "stream"
+        path = RECORDING_DIR / f"{stem}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.mp4"
+        recorder = VideoRecorder(path, fps, self.codec, self.record_queue, "latest" if live else "block").start()
+        print(f"[INFO] Recording annotated frames to {path} ({self.codec}, {recorder.fps:.1f} fps)")
+        return recorder
+
+    @staticmethod
+    def _close_recorder(recorder: Optional[VideoRecorder]) -> None:
+        if recorder is None:
+            return
+        recorder.close()
+        stats = recorder.stats()
+        print(f"[OK] Saved {stats['written']} frames to {stats['path']} (dropped {stats['dropped']})")
+        if stats["dropped"]:
+            print(f"[WARN] The encoder fell behind and dropped {stats['dropped']} frames; raise --record-queue to buffer more.")
+
+    def _show(
+        self,
+        window: str,
+        image: np.ndarray,
+        recorder: Optional[VideoRecorder] = None,
+        channel: str = "live",
+    ) -> int:
+        """Hand ``image`` to the recorder, the MJPEG viewers and, unless headless, the window.
+
+        Returns the pressed key (-1 when headless).
+        """
+        if recorder is not None:
+            recorder.write(image)
+        if self.streamer is not None:
+            self.streamer.publish(channel, image)
+        if self.headless:
+            return -1
+        with self.metrics.time("display"):
+            cv2.imshow(window, image)
+            return cv2.waitKey(1) & 0xFF
+
+    def _close_windows(self) -> None:
+        if not self.headless:  # headless OpenCV builds raise on any GUI call
+            cv2.destroyAllWindows()
+
+    @staticmethod
+    def _draw_overlay(image: np.ndarray, lines: List[str]) -> None:
+        for row, text in enumerate(lines):
             cv2.putText(
-                annotated,
-                label_text,
-                (x1, max(25, y1 - 10)),
+                image,
+                text,
+                (10, 30 + row * 25),
                 cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                color,
+                0.6,
+                (255, 255, 255),
                 2,
                 cv2.LINE_AA,
             )
 
-            latitude = BOOTH_COORDINATES[0] + uniform(-0.0008, 0.0008)
-            longitude = BOOTH_COORDINATES[1] + uniform(-0.0008, 0.0008)
-
-            event = DetectionEvent(
-                timestamp=datetime.now(timezone.utc).isoformat(),
-                source=source,
-                frame_index=self.total_frames,
-                raw_label=raw_label,
-                friendly_label=raw_label,
-                category=category,
-                confidence=conf,
-                latitude=latitude,
-                longitude=longitude,
-            )
-            self.logger.record(event)
-
-        return annotated, detections
-
     def run_webcam(self, source: int) -> None:
         if self.model is None:
             raise RuntimeError("Model is not loaded.")
 
-        cap = cv2.VideoCapture(source)
-        if not cap.isOpened():
+        reader = VideoSource(source, on_decode=self._observe_capture)
+        if not reader.opened:
+            reader.release()
             print(f"[ERROR] Unable to open camera index {source}.")
             return
 
+        recorder = self._open_recorder(reader.fps, f"camera_{source}", live=True)
         start_time = time.time()
         try:
             while True:
-                success, frame = cap.read()
+                success, frame = reader.read()
                 if not success:
                     print("[WARN] Unable to read frame from camera.")
                     break
 
-                self.total_frames += 1
-                inference_start = time.time()
-                results = self.model(frame, conf=self.confidence, verbose=False)
-                inference_ms = (time.time() - inference_start) * 1000
-                annotated, detected = self._annotate_frame(frame, results[0], source=f"camera:{source}")
-                self.total_detections += detected
-
-                if self.auto_save and detected > 0:
-                    filename = AUTO_SAVE_DIR / f"detection_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S_%f')}.jpg"
-                    cv2.imwrite(str(filename), frame)
+                annotated, _ = self._process_frame(frame, source=f"camera:{source}")
 
                 elapsed = time.time() - start_time
                 fps = self.total_frames / elapsed if elapsed > 0 else 0.0
                 self.frame_history.append(fps)
 
-                overlay = f"Frames: {self.total_frames} | Detections: {self.total_detections} | Inference: {inference_ms:.1f} ms | FPS: {fps:.1f}"
-                cv2.putText(
-                    annotated,
-                    overlay,
-                    (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.6,
-                    (255, 255, 255),
-                    2,
-                    cv2.LINE_AA,
-                )
+                self._draw_overlay(annotated, self._overlay_lines(fps))
 
-                cv2.imshow("CleanEye - Live Detection", annotated)
-                key = cv2.waitKey(1) & 0xFF
+                key = self._show("CleanEye - Live Detection", annotated, recorder)
 
                 if key in (ord("q"), ord("Q")):
                     print("[INFO] Stopping detection.")
@@ -255,8 +715,435 @@ class GarbageDetector:
                     cv2.imwrite(str(filename), annotated)
                     print(f"[OK] Snapshot saved to {filename}")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
+            reader.release()
+            self._close_recorder(recorder)
+            self._close_windows()
+
+    def _observe_capture(self, elapsed_ms: float) -> None:
+        """Decode-thread hook of the frame sources: book each frame's decode time as ``capture``."""
+        self.metrics.observe("capture", elapsed_ms)
+
+    def run_pipeline(
+        self,
+        source: Union[int, Path],
+        overflow: Optional[str] = None,
+        queue_size: int = 2,
+    ) -> None:
+        """Run capture, inference and render as overlapping pipeline stages.
+
+        Capture (the :class:`VideoSource` decode thread) and inference each get
+        a worker thread; rendering (drawing the overlay, ``imshow``/``waitKey``)
+        stays on the main thread because most OpenCV GUI backends refuse to
+        run anywhere else. Stages are joined by bounded
+        :class:`FrameQueue` instances. Live cameras default to the ``latest``
+        overflow policy, files to ``block``.
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not loaded.")
+
+        live = isinstance(source, int)
+        if not live and not Path(source).exists():
+            print(f"[ERROR] Video not found: {source}")
+            return
+
+        policy = overflow or ("latest" if live else "block")
+        reader = VideoSource(source, buffer=queue_size, policy=policy, on_decode=self._observe_capture, name="capture")
+        if not reader.opened:
+            reader.release()
+            print(f"[ERROR] Unable to open {'camera index' if live else 'video'} {source}.")
+            return
+
+        source_name = f"camera:{source}" if live else str(source)
+        window = "CleanEye - Live Detection" if live else "CleanEye - Video Detection"
+        stop_event = threading.Event()
+        capture_queue = reader.queue
+        render_queue = FrameQueue("render", queue_size, policy)
+
+        def inference_stage() -> None:
+            try:
+                while not stop_event.is_set():
+                    item = reader.next(timeout=0.5)
+                    if item is None:
+                        if reader.ended:
+                            print("[INFO] Video ended." if not live else "[WARN] Unable to read frame from camera.")
+                            break
+                        continue
+                    annotated, _ = self._process_frame(item.image, source=source_name)
+                    if not render_queue.put(annotated):
+                        break
+            finally:
+                render_queue.close()
+
+        reader.start()
+        workers = [StageThread("cleaneye-inference", inference_stage, stop_event)]
+        for worker in workers:
+            worker.start()
+
+        recorder = self._open_recorder(reader.fps, source_name if live else Path(source).stem, live)
+        start_time = time.time()
+        rendered = 0
+        try:
+            while not stop_event.is_set():
+                annotated = render_queue.get(timeout=0.5)
+                if annotated is None:
+                    if render_queue.closed:
+                        break
+                    continue
+                rendered += 1
+
+                elapsed = time.time() - start_time
+                fps = rendered / elapsed if elapsed > 0 else 0.0
+                self.frame_history.append(fps)
+
+                queues = " | ".join(
+                    f"{stage_queue.name}: {stage_queue.depth}/{stage_queue.maxsize} (dropped {stage_queue.dropped})"
+                    for stage_queue in (capture_queue, render_queue)
+                )
+                self._draw_overlay(annotated, self._overlay_lines(fps) + [queues])
+
+                key = self._show(window, annotated, recorder)
+                if key in (ord("q"), ord("Q")):
+                    print("[INFO] Stopping detection.")
+                    break
+                if key in (ord("s"), ord("S")):
+                    filename = SNAPSHOT_DIR / f"snapshot_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jpg"
+                    cv2.imwrite(str(filename), annotated)
+                    print(f"[OK] Snapshot saved to {filename}")
+        finally:
+            stop_event.set()
+            reader.release()
+            render_queue.close()
+            for worker in workers:
+                worker.join(timeout=5)
+            self._close_recorder(recorder)
+            self._close_windows()
+
+        for name, error in [("cleaneye-capture", reader.error)] + [(worker.name, worker.error) for worker in workers]:
+            if error is not None:
+                print(f"[ERROR] Pipeline stage {name} failed: {error}")
+        for stage_queue in (capture_queue, render_queue):
+            stats = stage_queue.stats()
+            print(
+                f"[INFO] Queue {stage_queue.name}: frames={stats['frames']} dropped={stats['dropped']} "
+                f"high_water={stats['high_water']}/{stats['maxsize']} policy={stats['policy']}"
+            )
+
+    def run_multiprocess(
+        self,
+        source: Union[int, Path],
+        processes: int,
+        slots: int = 0,
+        overflow: Optional[str] = None,
+    ) -> None:
+        """Decode in one process, infer in ``processes`` others, display here.
+
+        Frames travel through a :class:`SharedFrameRing`: the capture process
+        decodes into a shared-memory slot, an inference worker (each with its
+        own model) reads it in place and sends back only the detections, and
+        this process annotates the slot, shows it and hands it back. Results
+        are shown in capture order. Live cameras default to the ``latest``
+        policy (oldest unclaimed frame is dropped), files to ``block``.
+        Motion gating, ``--detect-every`` and adaptive resolution are
+        per-frame decisions of the single-process loop and are not applied.
+        """
+        import multiprocessing as mp
+
+        from shared_ring import SharedFrameRing, capture_process, drain, inference_process
+
+        live = isinstance(source, int)
+        if not live and not Path(source).exists():
+            print(f"[ERROR] Video not found: {source}")
+            return
+
+        # Probe the resolution (and FPS for the recorder); the capture process reopens the source
+        with VideoSource(source, buffer=1) as reader:
+            success, probe = reader.read()
+        if not success:
+            print(f"[ERROR] Unable to read from {'camera index' if live else 'video'} {source}.")
+            return
+        source_name = f"camera:{source}" if live else str(source)
+        recorder = self._open_recorder(reader.fps, source_name if live else Path(source).stem, live)
+
+        if self.motion_gate is not None or self.detect_every > 1 or self.resolution is not None:
+            print("[WARN] Motion gate, --detect-every and adaptive resolution are ignored with --processes.")
+        processes = max(1, processes)
+        policy = overflow or ("latest" if live else "block")
+        ctx = mp.get_context("spawn")  # fork would copy OpenCV/runtime thread state into the workers
+        # Each worker holds one slot, as many again wait here for in-order display, plus capture headroom
+        ring = SharedFrameRing(slots or 2 * processes + 2, probe.shape, policy, ctx)
+        stop_event = ctx.Event()
+        results = ctx.Queue()
+        spec = {
+            "weights": self.model_path,
+            "backend": self.backend,
+            "imgsz": self.imgsz,
+            "int8": self.int8,
+            "threads": max(1, (os.cpu_count() or 1) // processes),
+            "cache": self.model_cache,
+            "torchscript": self.torchscript,
+            "warmup_runs": self.warmup_runs,
+            "confidence": self.confidence,
+            "region": roi_for(self.rois, source_name) if self.rois else None,
+        }
+        workers = [ctx.Process(target=capture_process, args=(source if live else str(source), ring, stop_event), name="cleaneye-capture")]
+        workers += [
+            ctx.Process(target=inference_process, args=(index, ring, results, stop_event, spec), name=f"cleaneye-infer-{index}")
+            for index in range(processes)
+        ]
+        print(f"[INFO] Starting {processes} inference processes on a {ring.slots}-slot shared frame ring ({policy}).")
+        # Inference workers first so the capture process does not fill (or drop from) the ring while models load.
+        # The first one alone: on a cache miss it builds the cached model, which the others then load
+        workers[1].start()
+
+        window = "CleanEye - Live Detection" if live else "CleanEye - Video Detection"
+        pending: Dict[int, Tuple[int, Detections, float]] = {}
+        next_seq = 0
+        running = processes
+        ready = failed = late = rendered = 0
+        start_time = time.time()
+        quit_requested = False
+
+        def show_pending(flush: bool = False) -> None:
+            # Show in capture order. A gap before the oldest result is skipped only when no worker
+            # still holds an earlier frame, i.e. the ring dropped it (latest policy)
+            nonlocal next_seq, rendered, quit_requested
+            while pending and not quit_requested:
+                seq = min(pending)
+                if seq != next_seq and not flush:
+                    in_flight = set(ring.busy_seqs()).difference(pending)
+                    if any(other < seq for other in in_flight):
+                        break
+                slot, detections, elapsed_ms = pending.pop(seq)
+                next_seq = seq + 1
+                try:
+                    key = self._render_shared(ring, slot, detections, elapsed_ms, source_name, window, recorder)
+                finally:
+                    ring.release(slot)
+                rendered += 1
+                elapsed = time.time() - start_time
+                self.frame_history.append(rendered / elapsed if elapsed > 0 else 0.0)
+                if key in (ord("q"), ord("Q")):
+                    print("[INFO] Stopping detection.")
+                    quit_requested = True
+
+        try:
+            while running and not quit_requested:
+                message = drain(results, timeout=0.5)
+                if message is None:
+                    if not any(worker.is_alive() for worker in workers[1:]):
+                        break
+                    continue
+                kind, worker_id, payload = message
+                if kind in ("error", "ready"):
+                    if ready + failed == 0:
+                        for worker in workers[2:]:
+                            worker.start()
+                    if kind == "error":
+                        print(f"[ERROR] Inference process {worker_id} failed to load the model: {payload}")
+                        failed += 1
+                        running -= 1
+                    else:
+                        print(f"[OK] Worker {worker_id}: model {describe_startup(payload)}.")
+                        if not ready:
+                            self.startup = dict(payload)
+                            self.logger.publish("startup", dict(self.startup))
+                        ready += 1
+                    if ready and ready + failed == processes:
+                        workers[0].start()
+                        start_time = time.time()
+                    continue
+                if kind == "done":
+                    running -= 1
+                    continue
+
+                slot, seq, detections, elapsed_ms = payload
+                if seq < next_seq:
+                    # Its successor was already shown while this frame was still in a worker
+                    ring.release(slot)
+                    late += 1
+                    continue
+                pending[seq] = (slot, detections, elapsed_ms)
+                show_pending()
+            show_pending(flush=True)
+            if ready and not quit_requested:
+                print("[INFO] Video ended." if not live else "[WARN] Unable to read frame from camera.")
+        finally:
+            stop_event.set()
+            ring.close()
+            for worker in workers:
+                if worker.pid is not None:
+                    worker.join(timeout=5)
+                    if worker.is_alive():
+                        worker.terminate()
+            stats = ring.stats()
+            results.close()
+            ring.unlink()
+            self._close_recorder(recorder)
+            self._close_windows()
+
+        stats["late"] = late
+        self.logger.publish("shared_ring", stats)
+        print(
+            f"[INFO] Shared ring: frames={stats['frames']} inferred={stats['consumed']} dropped={stats['dropped']} "
+            f"late={late} blocked={stats['blocked_ms']:.0f} ms high_water={stats['high_water']}/{stats['slots']} "
+            f"policy={stats['policy']}"
+        )
+
+    def _render_shared(
+        self,
+        ring,
+        slot: int,
+        detections: Detections,
+        inference_ms: float,
+        source: str,
+        window: str,
+        recorder: Optional[VideoRecorder],
+    ) -> int:
+        """Annotate, show and log one frame of :meth:`run_multiprocess`; returns the pressed key.
+
+        The slot goes back to the capture process as soon as this returns, so
+        when the recorder or the MJPEG viewers keep the annotated image around
+        it is drawn on a copy. They own that copy from then on, so it is a
+        plain allocation rather than a pooled buffer; auto-save takes its own
+        pooled copy of the raw frame in :meth:`_annotate_frame`.
+        """
+        self.total_frames += 1
+        self.last_inference_ms = inference_ms
+        for stage, value_ms in (detections.speed or {"inference": inference_ms}).items():
+            self.metrics.observe(stage, value_ms)
+        frame = ring.frame(slot)
+        if recorder is not None or self.streamer is not None:
+            frame = frame.copy()
+        annotated, detected = self._annotate_frame(frame, detections, source=source)
+        tracker = self._tracker_for(source)
+        self._last_detections = tracker.active() if tracker is not None else detections
+        self.total_detections += detected
+
+        stats = ring.stats()
+        fps = self.frame_history[-1] if self.frame_history else 0.0
+        self._draw_overlay(
+            annotated,
+            self._overlay_lines(fps)
+            + [f"Ring: {stats['ready']} ready / {stats['slots']} | dropped {stats['dropped']} | blocked {stats['blocked_ms']:.0f} ms"],
+        )
+        self.logger.publish("shared_ring", stats)
+        return self._show(window, annotated, recorder)
+
+    def run_multi(self, sources: List[Union[int, Path]], max_batch: Optional[int] = None) -> None:
+        """Serve several cameras or video files from the one loaded model.
+
+        Each stream has a :class:`VideoSource` whose decode thread keeps only
+        its newest frame (files block instead, so no frame is skipped). The inference loop
+        gathers one pending frame per stream, starting at a rotating offset
+        so every stream gets a fair share of each batch, runs them through
+        the model in a single call and logs each result with ``stream:<n>``
+        as its source. With a motion gate each stream gets its own; frames of
+        a static stream are shown with that stream's previous detections and
+        left out of the batch. When no stream has a frame ready the loop
+        waits on one of them instead of polling.
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not loaded.")
+
+        streams: List[StreamState] = []
+        for index, source in enumerate(sources):
+            live = isinstance(source, int)
+            reader = VideoSource(source, buffer=1, on_decode=self._observe_capture, name=f"stream:{index}")
+            if not reader.opened:
+                reader.release()
+                print(f"[ERROR] Unable to open stream {index} ({source}); skipping.")
+                continue
+            gate = self.motion_gate
+            streams.append(
+                StreamState(
+                    name=f"stream:{index}",
+                    source=source,
+                    reader=reader,
+                    recorder=self._open_recorder(reader.fps, f"stream_{index}", live),
+                    motion_gate=MotionGate(gate.threshold, gate.refresh_seconds, gate.pixel_delta, gate.width) if gate else None,
+                )
+            )
+            print(f"[INFO] stream:{index} -> {'camera:' if live else ''}{source}")
+        if not streams:
+            print("[ERROR] No streams could be opened.")
+            return
+
+        for stream in streams:
+            stream.reader.start()
+
+        batch_limit = max_batch or len(streams)
+        offset = 0
+        start_time = time.time()
+        try:
+            while True:
+                order = streams[offset:] + streams[:offset]
+                offset = (offset + 1) % len(streams)
+                batch, owners = [], []
+                shown = False
+                for stream in order:
+                    item = stream.reader.next(timeout=0)
+                    if item is None:
+                        continue
+                    if stream.motion_gate is not None and not stream.motion_gate.should_infer(item.image):
+                        self.total_frames += 1
+                        self._show_stream(stream, self._redraw(item.image, stream.last_detections, stream.name))
+                        shown = True
+                        continue
+                    batch.append(item.image)
+                    owners.append(stream)
+                    if len(batch) >= batch_limit:
+                        break
+                if self.motion_gate is not None:
+                    self.logger.publish("motion_gate", {stream.name: stream.motion_gate.stats() for stream in streams})
+                if not batch and not shown:
+                    pending = [stream for stream in order if not stream.reader.ended]
+                    if not pending:
+                        break
+                    # Nothing decoded yet: sleep on one stream's queue rather than spinning over all of them
+                    item = pending[0].reader.next(timeout=0.01)
+                    if item is None:
+                        continue
+                    batch, owners = [item.image], [pending[0]]
+
+                if batch:
+                    results = self._predict(batch, [stream.name for stream in owners])
+                    for stream, frame, detections in zip(owners, batch, results):
+                        self.total_frames += 1
+                        stream.inferred += 1
+                        annotated, detected = self._annotate_frame(frame, detections, source=stream.name)
+                        tracker = self._tracker_for(stream.name)
+                        stream.last_detections = tracker.active() if tracker is not None else detections
+                        self.total_detections += detected
+                        self._show_stream(stream, annotated)
+
+                if self.headless:
+                    continue
+                with self.metrics.time("display"):
+                    key = cv2.waitKey(1) & 0xFF
+                if key in (ord("q"), ord("Q")):
+                    print("[INFO] Stopping detection.")
+                    break
+        finally:
+            for stream in streams:
+                stream.reader.release()
+                self._close_recorder(stream.recorder)
+            self._close_windows()
+
+        elapsed = time.time() - start_time
+        for stream in streams:
+            rate = stream.inferred / elapsed if elapsed > 0 else 0.0
+            skipped = f" skipped={stream.motion_gate.skipped}" if stream.motion_gate is not None else ""
+            print(f"[INFO] {stream.name}: inferred={stream.inferred} ({rate:.1f} fps){skipped} dropped={stream.reader.queue.dropped}")
+
+    def _show_stream(self, stream: StreamState, annotated: np.ndarray) -> None:
+        """Hand one stream's frame to its recorder, the MJPEG viewers and its window (no ``waitKey``)."""
+        if stream.recorder is not None:
+            stream.recorder.write(annotated)
+        if self.streamer is not None:
+            self.streamer.publish(stream.name, annotated)
+        if not self.headless:
+            with self.metrics.time("display"):
+                cv2.imshow(f"CleanEye - {stream.name}", annotated)
 
     def run_image(self, image_path: Path) -> None:
         if self.model is None:
@@ -267,15 +1154,131 @@ class GarbageDetector:
             return
 
         image = cv2.imread(str(image_path))
-        results = self.model(image, conf=self.confidence, verbose=False)
+        detections = self._predict(image, str(image_path))[0]
         self.total_frames += 1
-        annotated, detected = self._annotate_frame(image, results[0], source=str(image_path))
+        annotated, detected = self._annotate_frame(image, detections, source=str(image_path))
         self.total_detections += detected
         output_file = OUTPUT_DIR / f"image_detection_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.jpg"
         cv2.imwrite(str(output_file), annotated)
         print(f"[OK] Processed image. Detections: {detected}. Saved to {output_file}")
 
-    def run_video(self, video_path: Path) -> None:
+    def run_batch(self, folder: Path, batch_size: int = 8, workers: int = 0, max_side: int = 1280) -> None:
+        """Detect on every image below ``folder`` and write a resumable manifest.
+
+        Images are decoded and resized in a process pool, sent to the model
+        ``batch_size`` at a time, and their annotated copies are written by a
+        small thread pool. Results land in ``outputs/batch/<folder>/``; images
+        whose path+mtime+model-hash key is already in the manifest are skipped.
+        An image enters the manifest only once its annotated copy is written;
+        files that fail to decode are recorded as ``unreadable``.
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not loaded.")
+        if not folder.is_dir():
+            print(f"[ERROR] Folder not found: {folder}")
+            return
+
+        output_dir = OUTPUT_DIR / "batch" / folder.resolve().name
+        manifest = BatchManifest(output_dir)
+        model_hash = weights_hash(self.model_path)
+        keys = {path: file_key(path, model_hash) for path in list_images(folder)}
+        todo = [path for path, key in keys.items() if key not in manifest.done]
+        print(f"[INFO] {len(keys)} images found, {len(keys) - len(todo)} already processed, {len(todo)} to go.")
+        if not todo:
+            manifest.close()
+            return
+
+        workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        batch_size = max(1, batch_size)
+        processed = 0
+        start_time = last_report = time.time()
+
+        def manifest_row(path: Path, output: str, detections: int, class_counts: Dict[str, int], status: str) -> Dict[str, object]:
+            return {
+                "key": keys[path],
+                "path": str(path),
+                "mtime_ns": path.stat().st_mtime_ns,
+                "model_hash": model_hash,
+                "output": output,
+                "detections": detections,
+                "class_counts": class_counts,
+                "processed_at": datetime.now(timezone.utc).isoformat(),
+                "status": status,
+            }
+
+        def settle(writes: List[Tuple[Future, Dict[str, object]]]) -> None:
+            # Only images whose annotated copy is on disk count as done; the rest are retried on resume
+            rows = []
+            for future, row in writes:
+                try:
+                    written = future.result()
+                except Exception as exc:  # pragma: no cover - disk/codec errors
+                    print(f"[WARN] Unable to write {row['output']}: {exc}")
+                    continue
+                if not written:
+                    print(f"[WARN] Unable to write {row['output']}")
+                    continue
+                rows.append(row)
+            manifest.append(rows)
+
+        def flush(batch: List[Tuple[Path, np.ndarray]], writer: ThreadPoolExecutor) -> List[Tuple[Future, Dict[str, object]]]:
+            writes = []
+            for (path, image), detections in zip(batch, self._predict([image for _, image in batch])):
+                self.total_frames += 1
+                self.total_detections += len(detections)
+                self._log_boxes(detections, str(path))
+                output = output_dir / "annotated" / path.relative_to(folder)
+                output.parent.mkdir(parents=True, exist_ok=True)
+                future = writer.submit(cv2.imwrite, str(output), self.renderer.draw(image, detections))
+                class_counts: Dict[str, int] = defaultdict(int)
+                for label in detections.labels:
+                    class_counts[label] += 1
+                writes.append((future, manifest_row(path, str(output), len(detections), dict(class_counts), "ok")))
+            return writes
+
+        try:
+            with ThreadPoolExecutor(max_workers=2) as writer:
+                batch: List[Tuple[Path, np.ndarray]] = []
+                writes: List[Tuple[Future, Dict[str, object]]] = []
+                for path_str, image in iter_decoded(todo, workers, max_side):
+                    processed += 1
+                    if image is None:
+                        print(f"[WARN] Unable to read image: {path_str}")
+                        manifest.append([manifest_row(Path(path_str), "", 0, {}, "unreadable")])
+                    else:
+                        batch.append((Path(path_str), image))
+                    if len(batch) >= batch_size:
+                        # Settle the previous batch's writes only now, so they overlap this batch's inference
+                        previous, writes = writes, flush(batch, writer)
+                        settle(previous)
+                        batch = []
+
+                    now = time.time()
+                    if now - last_report >= 2.0:
+                        last_report = now
+                        rate = processed / (now - start_time)
+                        eta = (len(todo) - processed) / rate if rate > 0 else 0.0
+                        print(f"[INFO] {processed}/{len(todo)} images | {rate:.1f} img/s | ETA {int(eta // 60):02d}:{int(eta % 60):02d}")
+                if batch:
+                    writes += flush(batch, writer)
+                settle(writes)
+        finally:
+            manifest.close()
+
+        elapsed = time.time() - start_time
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        print(f"[OK] Processed {processed} images in {elapsed:.1f}s ({rate:.1f} img/s). Manifest: {manifest.jsonl_path}")
+
+    def run_video(self, video_path: Path, batch_size: int = 1, sample_rate: float = 0.0) -> None:
+        """Run detection over a video file.
+
+        With ``batch_size > 1`` up to that many decoded frames are sent to the
+        model in a single call; results are then annotated and logged in frame
+        order. ``sample_rate`` > 0 analyzes that many frames per second of
+        video time and skips the rest (see :class:`sampling.FrameSampler`), so
+        long recordings are covered end to end. A throughput report is
+        printed when the run ends.
+        """
         if self.model is None:
             raise RuntimeError("Model is not loaded.")
 
@@ -283,29 +1286,205 @@ class GarbageDetector:
             print(f"[ERROR] Video not found: {video_path}")
             return
 
-        cap = cv2.VideoCapture(str(video_path))
-        if not cap.isOpened():
+        batch_size = max(1, batch_size)
+        # Decode (and skip) ahead on the reader's thread while the model works on the current batch
+        reader = VideoSource(video_path, buffer=2 * batch_size + 2, sample_rate=sample_rate, on_decode=self._observe_capture)
+        if not reader.opened:
+            reader.release()
             print(f"[ERROR] Unable to open video: {video_path}")
             return
 
+        sampler = reader.sampler
+        if sample_rate > 0:
+            print(
+                f"[INFO] Sampling {sample_rate:g} frames per second of video (every {sampler.stride} frames, "
+                f"~{sampler.expected} of {sampler.frame_count})"
+            )
+        recorder = self._open_recorder(reader.fps, video_path.stem, live=False)
+        processed = 0
+        start_time = time.time()
         try:
-            while True:
-                success, frame = cap.read()
-                if not success:
-                    print("[INFO] Video ended.")
+            finished = False
+            while not finished:
+                batch = []
+                while len(batch) < batch_size:
+                    success, frame = reader.read()
+                    if not success:
+                        print("[INFO] Video ended.")
+                        finished = True
+                        break
+                    batch.append(frame)
+                if not batch:
                     break
 
-                self.total_frames += 1
-                results = self.model(frame, conf=self.confidence, verbose=False)
-                annotated, detected = self._annotate_frame(frame, results[0], source=str(video_path))
-                self.total_detections += detected
-                cv2.imshow("CleanEye - Video Detection", annotated)
-                key = cv2.waitKey(1) & 0xFF
-                if key in (ord("q"), ord("Q")):
-                    break
+                inputs = batch if batch_size > 1 else batch[0]
+                for frame, detections in zip(batch, self._predict(inputs, str(video_path))):
+                    self.total_frames += 1
+                    processed += 1
+                    annotated, detected = self._annotate_frame(frame, detections, source=str(video_path))
+                    self.total_detections += detected
+                    key = self._show("CleanEye - Video Detection", annotated, recorder)
+                    if key in (ord("q"), ord("Q")):
+                        finished = True
+                        break
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
+            reader.release()
+            self._close_recorder(recorder)
+            self._close_windows()
+
+        elapsed = time.time() - start_time
+        throughput = processed / elapsed if elapsed > 0 else 0.0
+        realtime = f" ({sampler.seconds / elapsed:.1f}x real-time)" if elapsed > 0 else ""
+        print(
+            f"[INFO] Processed {processed} frames in {elapsed:.1f}s "
+            f"(batch size {batch_size}): {throughput:.1f} frames/sec{realtime}"
+        )
+        if sample_rate > 0:
+            print(f"[INFO] Sampled {describe_sampling(sampler)}")
+            self.logger.publish("sampling", sampler.stats())
+
+    def _default_threads(self) -> Tuple[int, int]:
+        """The cv2 and torch thread counts in effect before a sweep changes them."""
+        torch_threads = 0
+        if self.backend == "torch":
+            import torch
+
+            torch_threads = torch.get_num_threads()
+        return cv2.getNumThreads(), torch_threads
+
+    def _set_threads(self, threads: int, defaults: Tuple[int, int]) -> None:
+        """Apply an intra-op thread count to the loaded backend; 0 restores ``defaults`` (see :meth:`_default_threads`)."""
+        cv2_default, torch_default = defaults
+        cv2.setNumThreads(threads if threads > 0 else cv2_default)
+        if self.backend == "torch":
+            import torch
+
+            torch.set_num_threads(threads if threads > 0 else torch_default)
+        else:
+            self.model = load_detector(self.model_path, self.backend, self.imgsz, self.int8, threads, self.model_cache)
+
+    def run_bench(
+        self,
+        video_path: Path,
+        confidences: Sequence[float] = (0.25,),
+        sizes: Sequence[int] = (DEFAULT_IMGSZ,),
+        threads: Sequence[int] = (0,),
+        batch_sizes: Sequence[int] = (1,),
+        max_frames: int = 300,
+        warmup: int = 10,
+    ) -> List[Dict[str, object]]:
+        """Replay ``video_path`` flat out for every combination of settings.
+
+        Nothing is displayed or logged. Per configuration, the first
+        ``warmup`` frames are inferred untimed; then up to ``max_frames``
+        frames are decoded, inferred (in batches) and annotated. Reported
+        latency is per frame from batch submit to annotated result, so larger
+        batches trade latency for throughput. Results are printed as a table
+        and saved to ``outputs/benchmarks``.
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not loaded.")
+        if not video_path.exists():
+            print(f"[ERROR] Video not found: {video_path}")
+            return []
+
+        results: List[Dict[str, object]] = []
+        defaults = self._default_threads()
+        for thread_count in threads:
+            self._set_threads(thread_count, defaults)
+            for confidence, imgsz, batch_size in itertools.product(confidences, sizes, batch_sizes):
+                reader = VideoSource(video_path, buffer=2 * batch_size + 2)
+                if not reader.opened:
+                    reader.release()
+                    print(f"[ERROR] Unable to open video: {video_path}")
+                    return results
+                latencies: List[float] = []
+                detections_total = 0
+                frames = 0
+                try:
+                    for _ in range(warmup):  # untimed: lets the runtime allocate for this input size
+                        success, frame = reader.read()
+                        if not success:
+                            break
+                        predict(self.model, frame, confidence, imgsz=imgsz)
+                    peak_rss = _rss_mb()
+                    start = time.perf_counter()
+                    while frames < max_frames:
+                        batch = []
+                        while len(batch) < min(batch_size, max_frames - frames):
+                            success, frame = reader.read()
+                            if not success:
+                                break
+                            batch.append(frame)
+                        if not batch:
+                            break
+                        submitted = time.perf_counter()
+                        for frame, detections in zip(batch, predict(self.model, batch, confidence, imgsz=imgsz)):
+                            self.renderer.draw(frame, detections)
+                            detections_total += len(detections)
+                        latencies.extend([(time.perf_counter() - submitted) * 1000] * len(batch))
+                        frames += len(batch)
+                        peak_rss = max(peak_rss, _rss_mb())
+                    wall = time.perf_counter() - start
+                finally:
+                    reader.release()
+
+                row: Dict[str, object] = {
+                    "confidence": confidence,
+                    "imgsz": imgsz,
+                    "threads": thread_count,
+                    "batch_size": batch_size,
+                    "frames": frames,
+                    "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+                    "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2) if latencies else 0.0,
+                    "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2) if latencies else 0.0,
+                    "latency_p99_ms": round(float(np.percentile(latencies, 99)), 2) if latencies else 0.0,
+                    "peak_rss_mb": round(peak_rss, 1),
+                    "detections_per_frame": round(detections_total / frames, 2) if frames else 0.0,
+                }
+                results.append(row)
+                print(
+                    f"[BENCH] conf={confidence:<5} imgsz={imgsz:<5} threads={thread_count or 'auto':<5} "
+                    f"batch={batch_size:<3} | {row['fps']:>7.1f} fps | p50 {row['latency_p50_ms']:>7.1f} ms "
+                    f"p95 {row['latency_p95_ms']:>7.1f} ms p99 {row['latency_p99_ms']:>7.1f} ms | "
+                    f"RSS {row['peak_rss_mb']:>7.1f} MB | {row['detections_per_frame']:.2f} det/frame"
+                )
+
+        BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+        report_path = BENCHMARK_DIR / f"bench_{video_path.stem}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
+        report = {
+            "video": str(video_path),
+            "model": str(self.model_path),
+            "backend": self.backend,
+            "int8": self.int8,
+            "warmup_frames": warmup,
+            "results": results,
+        }
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        if results:
+            best = max(results, key=lambda row: row["fps"])
+            print(
+                f"[OK] Fastest: conf={best['confidence']} imgsz={best['imgsz']} threads={best['threads'] or 'auto'} "
+                f"batch={best['batch_size']} at {best['fps']} fps. Results saved to {report_path}"
+            )
+        return results
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where only that is available)."""
+    try:
+        import psutil  # installed with ultralytics
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _parse_list(text: str, cast) -> List:
+    return [cast(item) for item in text.split(",") if item.strip()]
 
 
 def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
@@ -313,42 +1492,232 @@ def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
         description="CleanEye - Garbage Detection",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("mode", choices=["webcam", "image", "video"], nargs="?", default="webcam", help="Detection mode")
-    parser.add_argument("input", nargs="?", help="Image or video path when using the respective mode")
+    parser.add_argument("mode", choices=["webcam", "image", "video", "multi", "batch", "export", "bench"], nargs="?", default="webcam", help="Detection mode")
+    parser.add_argument("input", nargs="?", help="Image/video path, or image folder for batch mode")
     parser.add_argument("--model", default=str(MODEL_PATH), help="Path to YOLO weights")
     parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold (default: 0.25 for better detection)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch", help="Inference runtime (onnx/openvino export and cache next to the weights)")
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMGSZ, help="Model input size (also the export size for onnx/openvino and --torchscript)")
+    parser.add_argument("--int8", action="store_true", help="Use a dynamically quantized int8 model with onnx/openvino")
+    parser.add_argument("--no-model-cache", dest="model_cache", action="store_false", help="Skip the compiled artifacts in Weights/cache (onnx/openvino graphs, --torchscript trace)")
+    parser.add_argument(
+        "--torchscript",
+        action="store_true",
+        help="Torch backend: serve a cached fixed-size TorchScript trace (faster load; square letterbox, so boxes can differ slightly from best.pt)",
+    )
+    parser.add_argument("--warmup-runs", type=int, default=DEFAULT_WARMUP_RUNS, help="Dummy-frame inferences before the first real frame (0 = none)")
     parser.add_argument("--source", type=int, default=0, help="Camera index when using webcam mode")
+    parser.add_argument("--sources", nargs="+", default=[], help="Camera indices and/or video paths for multi mode")
+    parser.add_argument("--max-batch", type=int, default=None, help="Most streams per model call in multi mode (default: all)")
     parser.add_argument("--auto-save", action="store_true", help="Automatically save frames that contain detections")
+    parser.add_argument("--save-quality", type=int, default=90, help="JPEG quality for auto-saved frames")
+    parser.add_argument("--save-rate", type=float, default=2.0, help="Most auto-saved frames per second (0 = no limit)")
+    parser.add_argument("--save-track-interval", type=float, default=10.0, help="With --track, seconds before the same object is saved again")
+    parser.add_argument("--save-workers", type=int, default=2, help="Background threads writing auto-saved frames")
+    parser.add_argument("--save-queue", type=int, default=16, help="Auto-save frames waiting for a writer before new ones are dropped")
+    parser.add_argument("--pipeline", action="store_true", help="Overlap capture, inference and display on separate threads")
+    parser.add_argument(
+        "--overflow",
+        choices=OVERFLOW_POLICIES,
+        default=None,
+        help="Pipeline queue / shared ring policy when a stage falls behind (default: latest for webcam, block for video)",
+    )
+    parser.add_argument("--queue-size", type=int, default=2, help="Frames buffered between pipeline stages")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Inference processes fed from a shared-memory frame ring by a capture process (0 = single process)",
+    )
+    parser.add_argument("--ring-slots", type=int, default=0, help="Frame slots in the shared ring (default: 2 x processes + 2)")
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=0.0,
+        help="Video mode: analyze this many frames per second of video and skip the rest (0 = every frame)",
+    )
+    parser.add_argument("--batch-size", type=int, default=None, help="Frames (or images in batch mode) per model call (default: 1 for video, 8 for batch)")
+    parser.add_argument("--workers", type=int, default=0, help="Decode processes for batch mode (default: CPU count - 1)")
+    parser.add_argument("--max-side", type=int, default=1280, help="Resize batch images so the longest side fits (0 = keep size)")
+    parser.add_argument("--motion-gate", action="store_true", help="Skip inference while the camera scene is static")
+    parser.add_argument("--motion-threshold", type=float, default=0.01, help="Changed-pixel fraction that triggers inference")
+    parser.add_argument("--motion-refresh", type=float, default=5.0, help="Force an inference at least this often (seconds)")
+    parser.add_argument("--target-fps", type=float, default=None, help="Adapt input size/stride to hold this live FPS")
+    parser.add_argument("--latency-budget-ms", type=float, default=None, help="Adapt input size/stride to this per-frame budget")
+    parser.add_argument(
+        "--imgsz-ladder",
+        default=",".join(str(size) for size in DEFAULT_LADDER),
+        help="Comma-separated input sizes the adaptive controller may use",
+    )
+    parser.add_argument("--max-stride", type=int, default=1, help="Largest frame stride the adaptive controller may use")
+    parser.add_argument("--roi-config", default=str(ROI_CONFIG), help="JSON file of per-source ROI polygons (used if it exists)")
+    parser.add_argument("--track", action="store_true", help="Track objects and log one event per object instead of per box")
+    parser.add_argument("--detect-every", type=int, default=1, help="With --track, run the model every k-th live frame")
+    parser.add_argument("--event-store", choices=["jsonl", "sqlite"], default="jsonl", help="Where detection events are stored (sqlite: indexed history for queries and the dashboard)")
+    parser.add_argument("--event-db", default=str(EVENT_DB_PATH), help="SQLite event database (shared by concurrent detectors)")
+    parser.add_argument("--bench-conf", default="0.25", help="Bench mode: comma-separated confidence thresholds")
+    parser.add_argument("--bench-imgsz", default=str(DEFAULT_IMGSZ), help="Bench mode: comma-separated input sizes")
+    parser.add_argument("--bench-threads", default="0", help="Bench mode: comma-separated thread counts (0 = runtime default)")
+    parser.add_argument("--bench-batch", default="1", help="Bench mode: comma-separated batch sizes")
+    parser.add_argument("--bench-frames", type=int, default=300, help="Bench mode: timed frames per configuration")
+    parser.add_argument("--bench-warmup", type=int, default=10, help="Bench mode: untimed frames before each configuration")
+    parser.add_argument("--summary-interval-ms", type=int, default=500, help="Minimum time between live summary rewrites")
+    parser.add_argument("--headless", action="store_true", help="No display windows; annotated video is written to outputs/recordings")
+    parser.add_argument("--record", action="store_true", help="Also write the annotated video when a display is used")
+    parser.add_argument("--codec", default=DEFAULT_CODEC, help="FourCC codec for recordings (e.g. mp4v, avc1)")
+    parser.add_argument("--record-queue", type=int, default=64, help="Frames buffered for the encoder (live sources then drop the oldest, files wait)")
+    parser.add_argument("--stream-port", type=int, default=0, help="Serve annotated frames as MJPEG over HTTP on this port (0 = off)")
+    parser.add_argument("--stream-host", default="0.0.0.0", help="Interface for the MJPEG viewer server")
+    parser.add_argument("--stream-quality", type=int, default=80, help="JPEG quality for MJPEG viewers")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus stage latency metrics on this port (0 = off)")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Interface for the metrics endpoint")
     return parser.parse_args(argv)
 
 
+def _interrupt(signum, frame) -> None:
+    """SIGTERM handler: unwind like Ctrl+C so recordings and logs are closed properly."""
+    raise KeyboardInterrupt
+
+
 def main(argv: Optional[list] = None) -> None:
     args = parse_args(argv)
+    # systemd and docker stop with SIGTERM, which would otherwise kill the process without running any cleanup
+    signal.signal(signal.SIGTERM, _interrupt)
     if not check_environment():
         raise SystemExit(1)
 
+    if args.mode == "export":
+        path = export_onnx(Path(args.model), args.imgsz, args.int8)
+        print(f"[OK] Exported model cached at {path}")
+        return
+
+    roi_path = Path(args.roi_config)
+    rois = load_roi_config(roi_path) if roi_path.exists() else {}
+    if rois:
+        print(f"[OK] Loaded regions of interest for {', '.join(sorted(rois))} from {roi_path}")
+
+    resolution = None
+    if args.target_fps or args.latency_budget_ms:
+        resolution = ResolutionController(
+            target_fps=args.target_fps,
+            budget_ms=args.latency_budget_ms,
+            ladder=[int(size) for size in args.imgsz_ladder.split(",") if size.strip()],
+            max_stride=args.max_stride,
+        )
+
     detector = GarbageDetector(
         model_path=Path(args.model),
         confidence=args.conf,
         auto_save=args.auto_save,
+        snapshots=SnapshotWriter(
+            AUTO_SAVE_DIR,
+            quality=args.save_quality,
+            max_per_second=args.save_rate,
+            track_interval=args.save_track_interval,
+            workers=args.save_workers,
+            queue_size=args.save_queue,
+        )
+        if args.auto_save
+        else None,
+        logger=DetectionLogger(
+            summary_interval_ms=args.summary_interval_ms,
+            store=EventStore(Path(args.event_db)) if args.event_store == "sqlite" else None,
+        ),
+        motion_gate=MotionGate(args.motion_threshold, args.motion_refresh) if args.motion_gate else None,
+        tracker=SortTracker() if args.track else None,
+        detect_every=args.detect_every,
+        backend=args.backend,
+        imgsz=args.imgsz,
+        int8=args.int8,
+        rois=rois,
+        resolution=resolution,
+        headless=args.headless,
+        record=args.record,
+        codec=args.codec,
+        record_queue=args.record_queue,
+        model_cache=args.model_cache,
+        torchscript=args.torchscript,
+        warmup_runs=args.warmup_runs,
     )
 
-    if not detector.load_model():
+    bench_sizes = set(_parse_list(args.bench_imgsz, int)) if args.mode == "bench" else set()
+    # With --processes every inference worker loads its own model and reports its start-up stats
+    multiprocess = bool(args.processes) and args.mode in ("webcam", "video")
+    if not multiprocess and not detector.load_model(dynamic=bool(bench_sizes - {args.imgsz})):
+        raise SystemExit(1)
+
+    if args.mode in ("image", "video", "batch", "bench") and not args.input:
+        what = {"image": "an image path", "video": "a video path", "batch": "an image folder", "bench": "a video path"}[args.mode]
+        print(f"[ERROR] Please provide {what}.")
         raise SystemExit(1)
 
-    if args.mode == "webcam":
-        detector.run_webcam(args.source)
-    elif args.mode == "image":
-        if not args.input:
-            print("[ERROR] Please provide an image path.")
-            raise SystemExit(1)
-        detector.run_image(Path(args.input))
-    elif args.mode == "video":
-        if not args.input:
-            print("[ERROR] Please provide a video path.")
-            raise SystemExit(1)
-        detector.run_video(Path(args.input))
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = MetricsServer(detector.metrics_text, args.metrics_host, args.metrics_port).start()
+        print(f"[OK] Metrics endpoint at {metrics_server.url}")
+    if args.stream_port:
+        from streaming import MjpegServer
+
+        detector.streamer = MjpegServer(args.stream_host, args.stream_port, args.stream_quality).start()
+        print(f"[OK] Live MJPEG viewer at {detector.streamer.url}")
+
+    try:
+        if args.mode == "webcam":
+            if args.processes:
+                detector.run_multiprocess(args.source, args.processes, args.ring_slots, overflow=args.overflow)
+            elif args.pipeline:
+                detector.run_pipeline(args.source, overflow=args.overflow, queue_size=args.queue_size)
+            else:
+                detector.run_webcam(args.source)
+        elif args.mode == "image":
+            detector.run_image(Path(args.input))
+        elif args.mode == "video":
+            if args.processes:
+                detector.run_multiprocess(Path(args.input), args.processes, args.ring_slots, overflow=args.overflow)
+            elif args.pipeline:
+                detector.run_pipeline(Path(args.input), overflow=args.overflow, queue_size=args.queue_size)
+            else:
+                detector.run_video(Path(args.input), batch_size=args.batch_size or 1, sample_rate=args.sample_rate)
+        elif args.mode == "bench":
+            detector.run_bench(
+                Path(args.input),
+                confidences=_parse_list(args.bench_conf, float),
+                sizes=_parse_list(args.bench_imgsz, int),
+                threads=_parse_list(args.bench_threads, int),
+                batch_sizes=_parse_list(args.bench_batch, int),
+                max_frames=args.bench_frames,
+                warmup=args.bench_warmup,
+            )
+        elif args.mode == "batch":
+            detector.run_batch(Path(args.input), batch_size=args.batch_size or 8, workers=args.workers, max_side=args.max_side)
+        elif args.mode == "multi":
+            sources = [int(item) if item.isdigit() else Path(item) for item in args.sources]
+            if not sources:
+                print("[ERROR] Please provide --sources for multi mode.")
+                raise SystemExit(1)
+            detector.run_multi(sources, max_batch=args.max_batch)
+    except KeyboardInterrupt:
+        print("[INFO] Interrupted; shutting down.")
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        if detector.streamer is not None:
+            stats = detector.streamer.stats()
+            detector.streamer.stop()
+            print(f"[INFO] MJPEG viewer: {stats['published']} frames published, {stats['encoded']} encoded")
+        detector.finish()
+        detector.logger.close()
+        stats = detector.logger.stats()
+        print(
+            f"[INFO] Logged {int(stats['events_written'])} events in {int(stats['event_writes'])} log writes, "
+            f"{int(stats['summary_writes'])} summary writes (avg {stats['avg_write_ms']:.2f} ms, "
+            f"max {stats['max_write_ms']:.2f} ms)"
+        )
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry point
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:  # before the detection loop started, e.g. while the model loads
+        print("[INFO] Interrupted.")
+        raise SystemExit(130)
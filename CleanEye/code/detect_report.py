@@ -14,23 +14,15 @@ from typing import Dict, List
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+from backends import describe_startup, load_warm
+from inference import detect, draw_detections
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_WEIGHTS = ROOT_DIR / "Weights" / "best.pt"
 REPORTS_DIR = ROOT_DIR / "outputs" / "reports"
 MEDIA_DIR = ROOT_DIR / "media"
 
-# Simple color mapping
-COLORS = {
-    "0": (0, 165, 255),
-    "c": (255, 215, 0),
-    "garbage": (0, 0, 255),
-    "garbage_bag": (255, 0, 255),
-    "waste": (0, 255, 0),
-    "trash": (255, 140, 0),
-}
-
 
 class DetectionReport:
     """Generate before/after detection reports with statistics"""
@@ -39,6 +31,7 @@ class DetectionReport:
         self.model_path = model_path
         self.confidence = confidence
         self.model = None
+        self.startup: Dict = {}
         self.report_id = None
         self.detections: List[Dict] = []
         
@@ -46,8 +39,8 @@ class DetectionReport:
         """Load YOLO model"""
         try:
             print(f"[INFO] Loading model from {self.model_path}...")
-            self.model = YOLO(str(self.model_path))
-            print("[INFO] Model ready.")
+            self.model, self.startup = load_warm(self.model_path)
+            print(f"[INFO] Model ready: {describe_startup(self.startup)}.")
             return True
         except Exception as e:
             print(f"[ERROR] Failed to load model: {e}")
@@ -64,25 +57,15 @@ class DetectionReport:
             raise RuntimeError(f"Unable to read image: {image_path}")
         
         # Run detection
-        results = self.model(image, conf=self.confidence, verbose=False)
-        boxes = results[0].boxes
+        found = detect(self.model, image, self.confidence)
         
         # Collect detections
-        detections = []
+        detections = [
+            {"label": label, "confidence": conf, "bbox": list(bbox)}
+            for label, conf, bbox in found.rows()
+        ]
         class_counts = {}
-        
-        for box in boxes:
-            cls_id = int(box.cls[0])
-            conf = float(box.conf[0])
-            label = self.model.names[cls_id]
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            
-            detections.append({
-                "label": label,
-                "confidence": conf,
-                "bbox": [x1, y1, x2, y2]
-            })
-            
+        for label in found.labels:
             class_counts[label] = class_counts.get(label, 0) + 1
         
         return {
@@ -96,27 +79,7 @@ class DetectionReport:
     def annotate_image(self, image_path: Path, save_path: Path) -> np.ndarray:
         """Annotate image with detections"""
         image = cv2.imread(str(image_path))
-        results = self.model(image, conf=self.confidence, verbose=False)
-        
-        for box in results[0].boxes:
-            cls_id = int(box.cls[0])
-            conf = float(box.conf[0])
-            label = self.model.names[cls_id]
-            color = COLORS.get(label, (255, 255, 255))
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            
-            # Draw box
-            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
-            cv2.putText(
-                image,
-                f"{label} {conf:.0%}",
-                (x1, max(25, y1 - 10)),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                color,
-                2,
-                cv2.LINE_AA,
-            )
+        draw_detections(image, detect(self.model, image, self.confidence))
         
         # Save annotated image
         cv2.imwrite(str(save_path), image)
@@ -228,7 +191,8 @@ class DetectionReport:
             },
             "model": {
                 "path": str(self.model_path),
-                "type": "YOLOv8"
+                "type": "YOLOv8",
+                "startup": self.startup
             }
         }
         
@@ -0,0 +1,276 @@
+"""
+CleanEye - SQLite Event Store
+-----------------------------
+Indexed storage for detection events. The database runs in WAL mode, so
+several detector processes can append while the dashboard reads. Events
+are inserted in batches (one transaction per logger flush), and the query
+helpers below answer time-range, count and timeline questions from the
+timestamp/source/label indexes without scanning the whole history.
+
+Command line::
+
+    python code/event_store.py summary --since 2025-11-03T14:00 --until 2025-11-03T15:00 --source camera:2
+    python code/event_store.py export outputs/logs/events.jsonl --since 2025-11-03
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+EVENT_DB_PATH = ROOT_DIR / "outputs" / "logs" / "events.db"
+
+COLUMNS = (
+    "timestamp",
+    "source",
+    "frame_index",
+    "raw_label",
+    "friendly_label",
+    "category",
+    "confidence",
+    "latitude",
+    "longitude",
+    "event",
+    "track_id",
+    "duration_frames",
+)
+REQUIRED = ("timestamp", "source", "raw_label", "friendly_label")  # NOT NULL without a default
+DEFAULTS: Dict[str, object] = {"event": "detection"}  # mirrors the schema's column defaults
+GROUP_FIELDS = ("friendly_label", "raw_label", "category", "source", "event")
+BUCKETS = {"minute": 16, "hour": 13, "day": 10}  # ISO-8601 prefix lengths
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    source TEXT NOT NULL,
+    frame_index INTEGER,
+    raw_label TEXT NOT NULL,
+    friendly_label TEXT NOT NULL,
+    category TEXT,
+    confidence REAL,
+    latitude REAL,
+    longitude REAL,
+    event TEXT NOT NULL DEFAULT 'detection',
+    track_id INTEGER,
+    duration_frames INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_source_timestamp ON events (source, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_label_timestamp ON events (friendly_label, timestamp);
+"""
+
+TimeBound = Union[str, datetime, None]
+
+
+def _iso(bound: TimeBound) -> Optional[str]:
+    """Normalise a bound to the UTC ISO-8601 text the logger stores, so string order is time order."""
+    if bound is None:
+        return None
+    if isinstance(bound, str):
+        bound = datetime.fromisoformat(bound)
+    if bound.tzinfo is None:
+        bound = bound.replace(tzinfo=timezone.utc)
+    return bound.astimezone(timezone.utc).isoformat()
+
+
+class EventStore:
+    """Thread-safe handle on the events database (one connection, serialised by a lock)."""
+
+    def __init__(self, path: Path = EVENT_DB_PATH, readonly: bool = False) -> None:
+        self.path = path
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; fine for telemetry
+            self._conn.executescript(_SCHEMA)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "EventStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def insert(self, events: Iterable[Dict[str, object]]) -> int:
+        """Insert a batch of event dicts in a single transaction; returns the row count.
+
+        Missing keys (or None values) take the schema default; events missing a
+        required field are skipped with a warning so the rest of the batch is
+        still stored.
+        """
+        rows = []
+        for event in events:
+            missing = [column for column in REQUIRED if event.get(column) is None]
+            if missing:
+                print(f"[WARN] Skipping event without {', '.join(missing)}: {event}")
+                continue
+            rows.append(
+                tuple(DEFAULTS.get(column) if event.get(column) is None else event[column] for column in COLUMNS)
+            )
+        if not rows:
+            return 0
+        sql = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+        return len(rows)
+
+    @staticmethod
+    def _where(
+        since: TimeBound = None,
+        until: TimeBound = None,
+        source: Optional[str] = None,
+        label: Optional[str] = None,
+        counted_only: bool = False,
+    ) -> Tuple[str, List[object]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_iso(until))
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if label is not None:
+            clauses.append("friendly_label = ?")
+            params.append(label)
+        if counted_only:
+            # A track_end closes an object already counted at track_start.
+            clauses.append("event != 'track_end'")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def events(
+        self,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        source: Optional[str] = None,
+        label: Optional[str] = None,
+        limit: Optional[int] = 1000,
+    ) -> List[Dict[str, object]]:
+        """Most recent matching events first."""
+        where, params = self._where(since, until, source, label)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM events{where} ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def count(self, since: TimeBound = None, until: TimeBound = None, source: Optional[str] = None, label: Optional[str] = None) -> int:
+        where, params = self._where(since, until, source, label, counted_only=True)
+        with self._lock:
+            return int(self._conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0])
+
+    def count_by(
+        self,
+        field: str = "friendly_label",
+        since: TimeBound = None,
+        until: TimeBound = None,
+        source: Optional[str] = None,
+        label: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Counted objects per ``field`` value (label, category, source, ...)."""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group by {field!r}; choose one of {', '.join(GROUP_FIELDS)}")
+        where, params = self._where(since, until, source, label, counted_only=True)
+        sql = f"SELECT {field}, COUNT(*) FROM events{where} GROUP BY {field} ORDER BY COUNT(*) DESC"
+        with self._lock:
+            return {row[0]: int(row[1]) for row in self._conn.execute(sql, params)}
+
+    def timeline(
+        self,
+        bucket: str = "minute",
+        since: TimeBound = None,
+        until: TimeBound = None,
+        source: Optional[str] = None,
+        label: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """``(bucket_start, count)`` pairs in time order; buckets are UTC minute/hour/day prefixes."""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}; choose one of {', '.join(BUCKETS)}")
+        where, params = self._where(since, until, source, label, counted_only=True)
+        key = f"substr(timestamp, 1, {BUCKETS[bucket]})"
+        sql = f"SELECT {key} AS bucket, COUNT(*) FROM events{where} GROUP BY bucket ORDER BY bucket"
+        with self._lock:
+            return [(row[0], int(row[1])) for row in self._conn.execute(sql, params)]
+
+    def sources(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT source FROM events ORDER BY source")]
+
+    def iter_events(self, since: TimeBound = None, until: TimeBound = None, source: Optional[str] = None) -> Iterator[Dict[str, object]]:
+        """Matching events oldest first, streamed in chunks."""
+        where, params = self._where(since, until, source)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM events{where} ORDER BY timestamp, id", params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+
+    def export_jsonl(self, target: Path, since: TimeBound = None, until: TimeBound = None, source: Optional[str] = None) -> int:
+        """Write matching events to ``target`` in the ``live_detections.jsonl`` format."""
+        written = 0
+        with target.open("w", encoding="utf-8") as handle:
+            for event in self.iter_events(since, until, source):
+                handle.write(json.dumps(event) + "\n")
+                written += 1
+        return written
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="CleanEye - query or export the detection event store")
+    parser.add_argument("command", choices=["summary", "export"], help="Print counts, or export events as JSONL")
+    parser.add_argument("output", nargs="?", help="Target .jsonl file for export")
+    parser.add_argument("--db", default=str(EVENT_DB_PATH), help="Event database path")
+    parser.add_argument("--since", help="Start time (ISO-8601, UTC unless an offset is given)")
+    parser.add_argument("--until", help="End time, exclusive")
+    parser.add_argument("--source", help="Only this source (e.g. camera:0)")
+    parser.add_argument("--label", help="Only this label")
+    parser.add_argument("--bucket", choices=list(BUCKETS), default="hour", help="Timeline granularity for summary")
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"[ERROR] Event database not found: {db_path}")
+        raise SystemExit(1)
+
+    with EventStore(db_path, readonly=True) as store:
+        if args.command == "export":
+            if not args.output:
+                print("[ERROR] Please provide an output .jsonl path.")
+                raise SystemExit(1)
+            written = store.export_jsonl(Path(args.output), args.since, args.until, args.source)
+            print(f"[OK] Exported {written} events to {args.output}")
+            return
+
+        filters = dict(since=args.since, until=args.until, source=args.source, label=args.label)
+        print(f"[INFO] Objects counted: {store.count(**filters)}")
+        for label, count in store.count_by("friendly_label", **filters).items():
+            print(f"  {label}: {count}")
+        print(f"[INFO] Per {args.bucket}:")
+        for bucket, count in store.timeline(args.bucket, **filters):
+            print(f"  {bucket}: {count}")
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
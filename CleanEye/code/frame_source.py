@@ -0,0 +1,229 @@
+"""
+CleanEye - Prefetching Frame Sources
+------------------------------------
+One reader for every video loop in CleanEye. A :class:`FrameSource`
+decodes on a background thread into a bounded :class:`pipeline.FrameQueue`,
+so the next frame is being decoded while the caller is still processing the
+current one. Files use the ``block`` policy (no frame is lost), cameras
+``latest`` (a slow consumer gets the freshest frame, not a backlog).
+
+``read()`` mirrors ``cv2.VideoCapture.read()`` for drop-in use; iterating
+yields :class:`Frame` tuples that also carry the frame index and its
+position in the video. :class:`VideoSource` wraps OpenCV captures (with
+optional time-based sampling, see :mod:`sampling`);
+:class:`SyntheticSource` serves in-memory frames for tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from pipeline import FrameQueue, StageThread
+from sampling import FrameSampler
+
+
+class Frame(NamedTuple):
+    index: int  # position in the source (sampled sources skip indices)
+    seconds: float  # video time of the frame
+    image: np.ndarray
+
+
+class FrameSource:
+    """Base class: ``_produce`` runs on the decode thread, consumers call ``next``/``read``.
+
+    The thread starts on the first read (or :meth:`start`). Always
+    :meth:`release` the source - or use it as a context manager - so the
+    thread stops and the underlying device is closed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buffer: int,
+        policy: str,
+        fps: float = 0.0,
+        frame_count: int = 0,
+        width: int = 0,
+        height: int = 0,
+        live: bool = False,
+        on_decode: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self.name = name
+        self.queue = FrameQueue(name, buffer, policy)
+        self.fps = fps
+        self.frame_count = frame_count
+        self.width = width
+        self.height = height
+        self.live = live
+        self.opened = True
+        self.index = -1  # of the last frame returned
+        self.seconds = 0.0
+        self.decode_ms = 0.0
+        self.wait_ms = 0.0  # consumer time spent waiting for the decoder
+        self._on_decode = on_decode
+        self._stop = threading.Event()
+        self._thread: Optional[StageThread] = None
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """``(width, height)`` in pixels."""
+        return self.width, self.height
+
+    @property
+    def ended(self) -> bool:
+        """True once the decoder has finished and every buffered frame was read."""
+        return self.queue.closed and not self.queue.depth
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._thread.error if self._thread is not None else None
+
+    def _produce(self) -> Iterator[Frame]:
+        raise NotImplementedError
+
+    def start(self) -> "FrameSource":
+        if self._thread is None:
+            self._thread = StageThread(f"{self.name}-decode", self._run, self._stop)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            frames = self._produce()
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                frame = next(frames, None)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if frame is None:
+                    break
+                self.decode_ms += elapsed_ms
+                if self._on_decode is not None:
+                    self._on_decode(elapsed_ms)
+                if not self.queue.put(frame):
+                    break
+        finally:
+            self.queue.close()
+
+    def next(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """The next frame; None at the end of the source (or when ``timeout`` expires, see :attr:`ended`)."""
+        self.start()
+        start = time.perf_counter()
+        frame = self.queue.get(timeout)
+        self.wait_ms += (time.perf_counter() - start) * 1000
+        if frame is not None:
+            self.index, self.seconds = frame.index, frame.seconds
+        return frame
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Drop-in for ``cv2.VideoCapture.read()``."""
+        frame = self.next()
+        return (True, frame.image) if frame is not None else (False, None)
+
+    def __iter__(self) -> Iterator[Frame]:
+        while True:
+            frame = self.next()
+            if frame is None:
+                return
+            yield frame
+
+    def release(self) -> None:
+        """Stop decoding and close the source."""
+        self._stop.set()
+        self.queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._close()
+
+    def _close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FrameSource":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.release()
+
+    def stats(self) -> Dict[str, object]:
+        stats = self.queue.stats()
+        stats.update(decode_ms=round(self.decode_ms, 1), wait_ms=round(self.wait_ms, 1))
+        return stats
+
+
+class VideoSource(FrameSource):
+    """A camera index, video file or stream URL read through ``cv2.VideoCapture``.
+
+    ``buffer`` defaults to 4 frames for files and 2 for cameras (less
+    latency). ``sample_rate`` > 0 reads files at that many frames per second
+    of video; it can be changed later through ``source.sampler.rate``.
+    ``name`` (default ``camera:<n>`` or the path) also names the buffer
+    queue in stats. Check :attr:`opened` before use - like
+    ``VideoCapture``, an unreadable source simply yields no frames.
+    """
+
+    def __init__(
+        self,
+        source: Union[int, str, Path],
+        buffer: Optional[int] = None,
+        policy: Optional[str] = None,
+        sample_rate: float = 0.0,
+        on_decode: Optional[Callable[[float], None]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        live = isinstance(source, int)
+        self.source = source
+        self.cap = cv2.VideoCapture(source if live else str(source))
+        self.sampler = FrameSampler(self.cap, 0.0 if live else sample_rate)
+        super().__init__(
+            name or (f"camera:{source}" if live else str(source)),
+            buffer or (2 if live else 4),
+            policy or ("latest" if live else "block"),
+            fps=self.cap.get(cv2.CAP_PROP_FPS) or 0.0,
+            frame_count=max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))),
+            width=int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            live=live,
+            on_decode=on_decode,
+        )
+        self.opened = self.cap.isOpened()
+
+    def _produce(self) -> Iterator[Frame]:
+        if not self.opened:
+            return
+        for index, seconds, image in self.sampler:
+            yield Frame(index, seconds, image)
+
+    def _close(self) -> None:
+        self.cap.release()
+
+
+class SyntheticSource(FrameSource):
+    """In-memory frames behind the same interface, for tests and benchmarks.
+
+    Every frame handed out is a copy, so callers may draw on it in place
+    just like on decoded frames.
+    """
+
+    def __init__(
+        self,
+        frames: Sequence[np.ndarray],
+        fps: float = 30.0,
+        repeat: int = 1,
+        buffer: int = 4,
+        policy: str = "block",
+        live: bool = False,
+    ) -> None:
+        self.frames: List[np.ndarray] = list(frames)
+        self.repeat = max(1, repeat)
+        height, width = self.frames[0].shape[:2] if self.frames else (0, 0)
+        super().__init__("synthetic", buffer, policy, fps, len(self.frames) * self.repeat, width, height, live)
+        self.opened = bool(self.frames)
+
+    def _produce(self) -> Iterator[Frame]:
+        for index in range(self.frame_count):
+            yield Frame(index, index / self.fps, self.frames[index % len(self.frames)].copy())
@@ -0,0 +1,135 @@
+"""
+CleanEye - Shared Inference Core
+--------------------------------
+One place to run the model, decode its results and draw boxes. Results are
+pulled out of the model output as contiguous NumPy arrays in a single
+transfer, so per-frame Python overhead does not grow with the box count.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Simple color mapping - use raw model labels directly
+COLORS = {
+    "0": (0, 165, 255),           # Orange
+    "c": (255, 215, 0),            # Gold
+    "garbage": (0, 0, 255),        # Red
+    "garbage_bag": (255, 0, 255),  # Magenta
+    "waste": (0, 255, 0),          # Green
+    "trash": (255, 140, 0),        # Dark Orange
+}
+DEFAULT_COLOR = (255, 255, 255)
+
+
+@dataclass
+class Detections:
+    """Boxes for one frame: ``xyxy`` (N, 4) int32, ``confidence`` (N,), ``class_ids`` (N,).
+
+    ``track_ids`` is set when the boxes come from the tracker. ``speed`` holds
+    the per-image ``preprocess``/``inference``/``postprocess`` times in ms as
+    reported by the runtime (empty when unknown).
+    """
+
+    xyxy: np.ndarray
+    confidence: np.ndarray
+    class_ids: np.ndarray
+    names: Dict[int, str] = field(default_factory=dict)
+    track_ids: Optional[np.ndarray] = None
+    speed: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def empty(cls, names: Dict[int, str] | None = None) -> "Detections":
+        return cls(
+            xyxy=np.zeros((0, 4), dtype=np.int32),
+            confidence=np.zeros(0, dtype=np.float32),
+            class_ids=np.zeros(0, dtype=np.int32),
+            names=names or {},
+        )
+
+    def __len__(self) -> int:
+        return int(self.confidence.shape[0])
+
+    @property
+    def labels(self) -> List[str]:
+        names = self.names
+        return [names.get(cls_id, str(cls_id)) for cls_id in self.class_ids.tolist()]
+
+    def rows(self) -> Iterator[Tuple[str, float, Tuple[int, int, int, int]]]:
+        """Yield ``(label, confidence, (x1, y1, x2, y2))`` as plain Python values."""
+        for label, conf, box in zip(self.labels, self.confidence.tolist(), self.xyxy.tolist()):
+            yield label, conf, tuple(box)
+
+    def select(self, mask: np.ndarray) -> "Detections":
+        track_ids = self.track_ids[mask] if self.track_ids is not None else None
+        return Detections(self.xyxy[mask], self.confidence[mask], self.class_ids[mask], self.names, track_ids, self.speed)
+
+
+def _to_numpy(data) -> np.ndarray:
+    if hasattr(data, "cpu"):
+        data = data.cpu()
+    if hasattr(data, "numpy"):
+        data = data.numpy()
+    return np.asarray(data)
+
+
+def extract_detections(result, names: Dict[int, str]) -> Detections:
+    """Decode one Ultralytics result into a :class:`Detections` in one transfer."""
+    boxes = getattr(result, "boxes", None)
+    speed = dict(getattr(result, "speed", None) or {})
+    if boxes is None or len(boxes) == 0:
+        detections = Detections.empty(names)
+        detections.speed = speed
+        return detections
+
+    # Boxes.data rows are x1, y1, x2, y2, [track_id,] conf, cls
+    data = _to_numpy(boxes.data)
+    return Detections(
+        xyxy=np.ascontiguousarray(data[:, :4], dtype=np.int32),
+        confidence=np.ascontiguousarray(data[:, -2], dtype=np.float32),
+        class_ids=np.ascontiguousarray(data[:, -1], dtype=np.int32),
+        names=names,
+        speed=speed,
+    )
+
+
+def predict(model, images: Sequence[np.ndarray] | np.ndarray, confidence: float, **kwargs) -> List[Detections]:
+    """Run ``model`` on one image or a list of images and decode every result.
+
+    ``model`` is an Ultralytics ``YOLO`` or any backend exposing
+    ``detect_batch(images, confidence, **kwargs)`` (see ``backends.py``).
+    """
+    if hasattr(model, "detect_batch"):
+        batch = list(images) if isinstance(images, (list, tuple)) else [images]
+        return model.detect_batch(batch, confidence, **kwargs)
+    results = model(images, conf=confidence, verbose=False, **kwargs)
+    names = getattr(model, "names", {}) or {}
+    return [extract_detections(result, names) for result in results]
+
+
+def detect(model, image: np.ndarray, confidence: float, **kwargs) -> Detections:
+    """Run ``model`` on a single image."""
+    return predict(model, image, confidence, **kwargs)[0]
+
+
+def draw_detections(image: np.ndarray, detections: Detections) -> np.ndarray:
+    """Draw boxes and ``label NN%`` captions (prefixed ``#id`` when tracked) onto ``image`` in place."""
+    prefixes = [f"#{track_id} " for track_id in detections.track_ids.tolist()] if detections.track_ids is not None else None
+    for index, (label, conf, (x1, y1, x2, y2)) in enumerate(detections.rows()):
+        color = COLORS.get(label, DEFAULT_COLOR)
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(
+            image,
+            f"{prefixes[index] if prefixes else ''}{label} {conf:.0%}",
+            (x1, max(25, y1 - 10)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            color,
+            2,
+            cv2.LINE_AA,
+        )
+    return image
@@ -0,0 +1,154 @@
+"""
+CleanEye - Stage Latency Metrics
+--------------------------------
+Fixed-bucket latency histograms per pipeline stage (capture, preprocess,
+inference, postprocess, tracking, annotate, logging, display) with p50/p95/p99
+estimates, plus an optional local HTTP ``/metrics`` endpoint in the
+Prometheus text format.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+STAGES = ("capture", "preprocess", "inference", "postprocess", "tracking", "annotate", "logging", "display")
+DEFAULT_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Cumulative-friendly fixed-bucket histogram of millisecond timings."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.bounds: List[float] = sorted(buckets_ms)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        index = 0
+        for index, bound in enumerate(self.bounds):
+            if value_ms <= bound:
+                break
+        else:
+            index = len(self.bounds)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max_ms
+                # Never report more than was actually observed.
+                return min(self.max_ms, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50), 3),
+            "p95_ms": round(self.quantile(0.95), 3),
+            "p99_ms": round(self.quantile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class StageMetrics:
+    """Thread-safe set of per-stage histograms."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets_ms = buckets_ms
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, value_ms: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram(self.buckets_ms)
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            ordered = sorted(self.histograms, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+            return {stage: self.histograms[stage].summary() for stage in ordered}
+
+    def prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render all histograms (in seconds, as Prometheus expects) plus optional gauges."""
+        lines = [
+            "# HELP cleaneye_stage_latency_seconds Per-stage processing latency.",
+            "# TYPE cleaneye_stage_latency_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.bounds) + [None], histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound is None else f"{bound / 1000:g}"
+                    lines.append(f'cleaneye_stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'cleaneye_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.total_ms / 1000:.6f}')
+                lines.append(f'cleaneye_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE cleaneye_{name} gauge")
+            lines.append(f"cleaneye_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``GET /metrics`` from a daemon thread on a local port."""
+
+    def __init__(self, render: Callable[[], str], host: str = "127.0.0.1", port: int = 9108) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # only when serving
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:  # silence per-request logging
+                return
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="cleaneye-metrics", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
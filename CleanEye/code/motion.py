@@ -0,0 +1,81 @@
+"""
+CleanEye - Motion Gate
+----------------------
+Cheap frame-difference check in front of the model. Static scenes reuse the
+last detections instead of paying for a full YOLO pass on every frame.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide per frame whether the scene changed enough to re-run inference.
+
+    Frames are compared, downscaled and blurred, against the frame that was
+    last sent to the model. Inference runs when the fraction of pixels that
+    changed by more than ``pixel_delta`` reaches ``threshold``, or when
+    ``refresh_seconds`` have passed since the last inference.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.01,
+        refresh_seconds: float = 5.0,
+        pixel_delta: int = 25,
+        width: int = 160,
+    ) -> None:
+        self.threshold = threshold
+        self.refresh_seconds = refresh_seconds
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.inferred = 0
+        self.skipped = 0
+        self.last_change = 0.0
+        self._reference: Optional[np.ndarray] = None
+        self._last_inference = 0.0
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        height = max(1, int(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _changed_fraction(self, current: np.ndarray) -> float:
+        if self._reference is None or current.shape != self._reference.shape:
+            return 1.0
+        diff = cv2.absdiff(current, self._reference)
+        changed = cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)[1]
+        return cv2.countNonZero(changed) / diff.size
+
+    def changed_fraction(self, frame: np.ndarray) -> float:
+        """Fraction of pixels that differ from the reference frame."""
+        return self._changed_fraction(self._prepare(frame))
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """Return True (and adopt ``frame`` as the new reference) when inference is due."""
+        now = time.monotonic()
+        current = self._prepare(frame)
+        self.last_change = self._changed_fraction(current)
+        if self.last_change >= self.threshold or now - self._last_inference >= self.refresh_seconds:
+            self._reference = current
+            self._last_inference = now
+            self.inferred += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def stats(self) -> Dict[str, float]:
+        total = self.inferred + self.skipped
+        return {
+            "inferred_frames": self.inferred,
+            "skipped_frames": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+            "last_change": self.last_change,
+            "threshold": self.threshold,
+        }
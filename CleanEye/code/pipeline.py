@@ -0,0 +1,110 @@
+"""
+CleanEye - Frame Pipeline Primitives
+------------------------------------
+Bounded queues and stage threads used by the pipelined capture ->
+inference -> render mode in detect_pro.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+OVERFLOW_POLICIES = ("latest", "block")
+
+
+class FrameQueue:
+    """Bounded hand-off queue between two pipeline stages.
+
+    With the ``latest`` policy a full queue drops its oldest item so the
+    consumer always sees the freshest frame (live cameras). With ``block``
+    the producer waits for room, so no frame is ever lost (video files).
+    """
+
+    def __init__(self, name: str, maxsize: int = 2, policy: str = "block") -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items: Deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def put(self, item: Any) -> bool:
+        """Queue ``item``. Returns False once the queue has been closed."""
+        with self._cond:
+            if self.policy == "block":
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            elif len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            if self._closed:
+                return False
+            self._items.append(item)
+            self.put_count += 1
+            self.high_water = max(self.high_water, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Return the next item, or None when closed and drained (or timed out)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._items and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        """Stop accepting items; consumers drain what is left, then get None."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "depth": self.depth,
+            "maxsize": self.maxsize,
+            "high_water": self.high_water,
+            "policy": self.policy,
+            "frames": self.put_count,
+            "dropped": self.dropped,
+        }
+
+
+class StageThread(threading.Thread):
+    """Daemon thread that runs one pipeline stage and remembers its failure."""
+
+    def __init__(self, name: str, target: Callable[[], None], stop_event: threading.Event) -> None:
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._stop_event = stop_event
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except BaseException as exc:  # pragma: no cover - surfaced by the caller
+            self.error = exc
+            self._stop_event.set()
@@ -0,0 +1,99 @@
+"""
+CleanEye - Annotated Video Recorder
+-----------------------------------
+Writes annotated frames to a video file from a dedicated encoder thread.
+The detector only hands frames to a bounded queue. For live cameras it uses
+the ``latest`` policy, so a slow disk or codec drops frames instead of
+stalling inference; recordings of files use ``block`` and keep every frame.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from pipeline import FrameQueue, StageThread
+
+DEFAULT_CODEC = "mp4v"
+FALLBACK_FPS = 30.0  # webcams often report 0 FPS
+
+
+class VideoRecorder:
+    """Encode frames to ``path`` at ``fps`` in the background.
+
+    The writer is opened on the first frame so the output keeps the frame
+    size of whatever is recorded (the source resolution for annotated
+    frames). ``policy`` is the queue's overflow policy (see
+    :class:`pipeline.FrameQueue`).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fps: float,
+        codec: str = DEFAULT_CODEC,
+        queue_size: int = 64,
+        policy: str = "latest",
+    ) -> None:
+        if len(codec) != 4:
+            raise ValueError(f"Codec must be a FourCC code such as 'mp4v' or 'avc1', got {codec!r}")
+        self.path = path
+        self.fps = fps if fps and fps > 1 else FALLBACK_FPS
+        self.codec = codec
+        self.frames = FrameQueue(f"encoder:{path.name}", queue_size, policy)
+        self.written = 0
+        self._stop = threading.Event()
+        self._thread = StageThread(f"cleaneye-encoder-{path.stem}", self._encode, self._stop)
+
+    def start(self) -> "VideoRecorder":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def write(self, frame: np.ndarray) -> bool:
+        """Queue ``frame``; when full, ``latest`` drops the oldest queued frame and ``block`` waits."""
+        return self.frames.put(frame)
+
+    def close(self) -> None:
+        """Flush the queued frames and finalize the file."""
+        self.frames.close()
+        self._thread.join()
+        if self._thread.error is not None:
+            print(f"[ERROR] Recording to {self.path} failed: {self._thread.error}")
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._thread.error
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "path": str(self.path),
+            "fps": round(self.fps, 2),
+            "codec": self.codec,
+            "written": self.written,
+            "dropped": self.frames.dropped,
+            "high_water": self.frames.high_water,
+        }
+
+    def _encode(self) -> None:
+        writer = None
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(str(self.path), cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+                    if not writer.isOpened():
+                        raise RuntimeError(f"OpenCV could not open a '{self.codec}' writer for {self.path}")
+                writer.write(frame)
+                self.written += 1
+        finally:
+            self.frames.close()
+            if writer is not None:
+                writer.release()
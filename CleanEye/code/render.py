@@ -0,0 +1,170 @@
+"""
+CleanEye - Cached Annotation Renderer
+-------------------------------------
+Draws detection boxes and ``label NN%`` captions like
+:func:`inference.draw_detections`, but the anti-aliased caption text is
+rendered once per (caption, colour) into a sprite - an alpha mask plus its
+premultiplied colour - and alpha-blitted afterwards. Captions repeat
+constantly (a handful of classes times 101 percentages), so steady-state
+frames draw no text at all.
+
+Frames are annotated in place by default. Callers that still need the
+original pass ``preserve=True`` and get a copy in a :class:`BufferPool`
+buffer instead, which they hand back with :meth:`AnnotationRenderer.release`
+once nothing reads it any more.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from inference import COLORS, DEFAULT_COLOR, Detections
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.7
+FONT_THICKNESS = 2
+BOX_THICKNESS = 2
+
+
+class BufferPool:
+    """Reusable frame buffers, keyed by shape and dtype.
+
+    ``acquire`` returns a released buffer of the requested shape when one is
+    free and allocates otherwise; ``release`` hands a buffer back. The pool
+    only keeps released buffers (at most ``per_shape`` of each kind), so a
+    buffer that is never released is simply never reused.
+    """
+
+    def __init__(self, per_shape: int = 4) -> None:
+        self.per_shape = max(1, per_shape)
+        self.allocated = 0
+        self.reused = 0
+        self._free: Dict[Tuple[Tuple[int, ...], str], List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                self.reused += 1
+                return free.pop()
+            self.allocated += 1
+        return np.empty(shape, dtype)
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return ``buffer`` for reuse; the caller must not touch it afterwards."""
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.per_shape:
+                free.append(buffer)
+
+    def copy(self, frame: np.ndarray) -> np.ndarray:
+        """A pooled copy of ``frame``."""
+        buffer = self.acquire(frame.shape, frame.dtype)
+        np.copyto(buffer, frame)
+        return buffer
+
+    def stats(self) -> dict:
+        with self._lock:
+            free = sum(len(buffers) for buffers in self._free.values())
+        return {"pool_allocated": self.allocated, "pool_reused": self.reused, "pool_free": free}
+
+
+class _Sprite:
+    __slots__ = ("inverse", "premultiplied", "offset")
+
+    def __init__(self, text: str, color: Tuple[int, int, int]) -> None:
+        (width, height), baseline = cv2.getTextSize(text, FONT, FONT_SCALE, FONT_THICKNESS)
+        pad = FONT_THICKNESS
+        mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, height + pad), FONT, FONT_SCALE, 255, FONT_THICKNESS, cv2.LINE_AA)
+        alpha = np.repeat(mask[:, :, None], 3, axis=2)
+        # uint8 throughout so the blend runs on OpenCV's saturating SIMD kernels
+        self.inverse = 255 - alpha
+        self.premultiplied = np.rint(alpha.astype(np.float32) * np.asarray(color, dtype=np.float32) / 255.0).astype(np.uint8)
+        self.offset = (pad, height + pad)  # sprite pixel that lands on the putText origin
+
+    def blit(self, image: np.ndarray, origin: Tuple[int, int]) -> None:
+        """Blend into ``image`` so the text sits where ``cv2.putText`` at ``origin`` would draw it."""
+        x0, y0 = origin[0] - self.offset[0], origin[1] - self.offset[1]
+        height, width = self.inverse.shape[:2]
+        inverse, premultiplied = self.inverse, self.premultiplied
+        if x0 < 0 or y0 < 0 or x0 + width > image.shape[1] or y0 + height > image.shape[0]:
+            left, top = max(0, -x0), max(0, -y0)
+            right, bottom = min(width, image.shape[1] - x0), min(height, image.shape[0] - y0)
+            if right <= left or bottom <= top:
+                return
+            inverse, premultiplied = inverse[top:bottom, left:right], premultiplied[top:bottom, left:right]
+            x0, y0, width, height = x0 + left, y0 + top, right - left, bottom - top
+        region = image[y0 : y0 + height, x0 : x0 + width]
+        cv2.add(cv2.multiply(region, inverse, scale=1 / 255), premultiplied, dst=region)
+
+
+class AnnotationRenderer:
+    """Box-and-caption renderer with an LRU cache of caption sprites.
+
+    Confidences are bucketed to whole percent - exactly what the caption
+    shows - so untracked captions need at most ``classes x 101`` sprites;
+    ``#id`` prefixes of tracked boxes are why the cache is bounded.
+    """
+
+    def __init__(self, pool: Optional[BufferPool] = None, max_sprites: int = 2048) -> None:
+        self.pool = pool or BufferPool()
+        self.max_sprites = max_sprites
+        self.hits = 0
+        self.misses = 0
+        self._sprites: "OrderedDict[Tuple[str, Tuple[int, int, int]], _Sprite]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def target(self, frame: np.ndarray, preserve: bool = False) -> np.ndarray:
+        """The image to draw on: ``frame`` itself, or with ``preserve`` a pooled copy of it."""
+        return self.pool.copy(frame) if preserve else frame
+
+    def release(self, image: np.ndarray) -> None:
+        """Hand a pooled copy from :meth:`target` back once nothing reads it."""
+        self.pool.release(image)
+
+    def render(self, frame: np.ndarray, detections: Detections, preserve: bool = False) -> np.ndarray:
+        """Annotate ``frame`` (or, with ``preserve``, a pooled copy of it) and return the image drawn on."""
+        return self.draw(self.target(frame, preserve), detections)
+
+    def draw(self, image: np.ndarray, detections: Detections) -> np.ndarray:
+        """Drop-in for :func:`inference.draw_detections`: draws onto ``image`` in place."""
+        if not len(detections):
+            return image
+        prefixes = [f"#{track_id} " for track_id in detections.track_ids.tolist()] if detections.track_ids is not None else None
+        percents = np.rint(detections.confidence * 100).astype(np.int32).tolist()
+        for index, (label, percent, (x1, y1, x2, y2)) in enumerate(
+            zip(detections.labels, percents, detections.xyxy.tolist())
+        ):
+            color = COLORS.get(label, DEFAULT_COLOR)
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, BOX_THICKNESS)
+            text = f"{prefixes[index] if prefixes else ''}{label} {percent}%"
+            self._sprite(text, color).blit(image, (x1, max(25, y1 - 10)))
+        return image
+
+    def stats(self) -> dict:
+        return {"sprites": len(self._sprites), "sprite_hits": self.hits, "sprite_misses": self.misses, **self.pool.stats()}
+
+    def _sprite(self, text: str, color: Tuple[int, int, int]) -> _Sprite:
+        key = (text, color)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+        sprite = _Sprite(text, color)
+        with self._lock:
+            self.misses += 1
+            self._sprites[key] = sprite
+            if len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+        return sprite
@@ -0,0 +1,83 @@
+"""
+CleanEye - Regions of Interest
+------------------------------
+Per-source polygon masks. The detector crops each frame to the bounding
+rectangle of its polygons before inference, maps boxes back to frame
+coordinates and drops detections whose centre falls outside every polygon.
+
+Config file (JSON), keyed by detection source with ``"*"`` as fallback.
+Points are pixels, or fractions of the frame size when every value is <= 1::
+
+    {
+        "camera:0": [[[0.0, 0.4], [1.0, 0.4], [1.0, 1.0], [0.0, 1.0]]],
+        "*": [[[100, 300], [1180, 300], [1180, 720], [100, 720]]]
+    }
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from inference import Detections
+
+Polygon = Sequence[Sequence[float]]
+
+
+class RegionOfInterest:
+    """Union of polygons for one source; geometry is cached per frame size."""
+
+    def __init__(self, polygons: List[Polygon]) -> None:
+        if not polygons:
+            raise ValueError("A region of interest needs at least one polygon.")
+        self.polygons = [np.asarray(polygon, dtype=np.float32) for polygon in polygons]
+        self.normalized = all(float(np.abs(polygon).max()) <= 1.0 for polygon in self.polygons)
+        self._cache: Dict[Tuple[int, int], Tuple[Tuple[int, int, int, int], np.ndarray, List[np.ndarray]]] = {}
+
+    def _geometry(self, shape: Tuple[int, int]) -> Tuple[Tuple[int, int, int, int], np.ndarray, List[np.ndarray]]:
+        if shape not in self._cache:
+            height, width = shape
+            scale = np.array([width, height], dtype=np.float32) if self.normalized else 1.0
+            points = [np.round(polygon * scale).astype(np.int32) for polygon in self.polygons]
+            mask = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(mask, points, 255)
+            x, y, w, h = cv2.boundingRect(np.concatenate(points))
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + w), min(height, y + h)
+            self._cache[shape] = ((x0, y0, x1, y1), mask, points)
+        return self._cache[shape]
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """View of ``frame`` limited to the ROI bounding rectangle (no copy)."""
+        (x0, y0, x1, y1), _, _ = self._geometry(frame.shape[:2])
+        return frame[y0:y1, x0:x1]
+
+    def restore(self, detections: Detections, shape: Tuple[int, int]) -> Detections:
+        """Shift crop-space boxes back to frame space and keep those centred inside the polygons."""
+        if not len(detections):
+            return detections
+        (x0, y0, _, _), mask, _ = self._geometry(shape)
+        xyxy = detections.xyxy + np.array([x0, y0, x0, y0], dtype=detections.xyxy.dtype)
+        centres_x = np.clip((xyxy[:, 0] + xyxy[:, 2]) // 2, 0, shape[1] - 1)
+        centres_y = np.clip((xyxy[:, 1] + xyxy[:, 3]) // 2, 0, shape[0] - 1)
+        shifted = Detections(xyxy, detections.confidence, detections.class_ids, detections.names, detections.track_ids, detections.speed)
+        return shifted.select(mask[centres_y, centres_x] > 0)
+
+    def draw(self, image: np.ndarray, color: Tuple[int, int, int] = (0, 255, 255)) -> None:
+        _, _, points = self._geometry(image.shape[:2])
+        cv2.polylines(image, points, True, color, 1, cv2.LINE_AA)
+
+
+def load_roi_config(path: Path) -> Dict[str, RegionOfInterest]:
+    """Read ``{source: [polygon, ...]}`` from a JSON file."""
+    with path.open("r", encoding="utf-8") as handle:
+        raw = json.load(handle)
+    return {source: RegionOfInterest(polygons) for source, polygons in raw.items()}
+
+
+def roi_for(rois: Dict[str, RegionOfInterest], source: str) -> Optional[RegionOfInterest]:
+    return rois.get(source) or rois.get("*")
@@ -0,0 +1,301 @@
+"""
+CleanEye - Shared-Memory Frame Ring
+-----------------------------------
+Process-level counterpart of :class:`pipeline.FrameQueue`. A capture process
+decodes frames straight into the slots of one
+``multiprocessing.shared_memory`` block; inference processes claim slots by
+index and see the pixels as NumPy views, so frame data is never pickled or
+copied between processes. Only slot numbers, sequence numbers and the small
+detection arrays cross process boundaries.
+
+Slot life cycle: ``FREE -> WRITING -> READY -> BUSY -> FREE``. ``BUSY`` lasts
+until the consumer that finished with the frame (in detect_pro, the display
+loop) calls :meth:`SharedFrameRing.release`. With the ``latest`` policy a
+full ring recycles its oldest READY frame (counted as dropped); with
+``block`` the capture process waits (counted as blocked time).
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import signal
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pipeline import OVERFLOW_POLICIES
+
+FREE, WRITING, READY, BUSY = 0, 1, 2, 3
+
+
+class SharedFrameRing:
+    """Fixed number of equally sized frame slots in shared memory.
+
+    Create it in the parent with the multiprocessing context the workers
+    use and pass it to them as a ``Process`` argument; children re-attach
+    to the same block by name. Only the creator unlinks the block (the
+    children share its resource tracker, which cleans up after a crash).
+    """
+
+    def __init__(self, slots: int, shape: Tuple[int, ...], policy: str = "latest", ctx=None) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        ctx = ctx or mp.get_context("spawn")
+        self.slots = max(2, slots)
+        self.shape = tuple(shape)
+        self.policy = policy
+        self.frame_bytes = int(np.prod(self.shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.frame_bytes)
+        self._owner = True
+        self._cond = ctx.Condition()
+        self._state = ctx.Array("b", self.slots, lock=False)
+        self._seq = ctx.Array("q", self.slots, lock=False)
+        # next_seq, written, dropped, consumed, high_water, closed
+        self._counters = ctx.Array("q", 6, lock=False)
+        self._blocked = ctx.Value("d", 0.0, lock=False)
+        self._views = self._make_views()
+
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        state["_shm_name"] = self._shm.name
+        for key in ("_shm", "_views"):
+            del state[key]
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        name = state.pop("_shm_name")
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._views = self._make_views()
+
+    def _make_views(self):
+        buffer = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=self._shm.buf)
+        return [buffer[index] for index in range(self.slots)]
+
+    def frame(self, slot: int) -> np.ndarray:
+        """Writable view of ``slot`` (no copy)."""
+        return self._views[slot]
+
+    # -- producer -----------------------------------------------------------------
+
+    def acquire_write(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Claim a slot to decode into; None when the ring is closed (or, with ``block``, on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            waited_from = None
+            while True:
+                if self._counters[5]:
+                    return None
+                for slot in range(self.slots):
+                    if self._state[slot] == FREE:
+                        break
+                else:
+                    slot = -1
+                if slot < 0 and self.policy == "latest":
+                    slot = self._oldest(READY)
+                    if slot >= 0:
+                        self._counters[2] += 1  # dropped: overwritten before anyone claimed it
+                if slot >= 0:
+                    if waited_from is not None:
+                        self._blocked.value += time.monotonic() - waited_from
+                    self._state[slot] = WRITING
+                    return slot
+                # Every slot is being written or processed: back-pressure the producer
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._blocked.value += time.monotonic() - waited_from
+                    return None
+                self._cond.wait(remaining)
+
+    def commit(self, slot: int) -> int:
+        """Publish a written slot to consumers; returns its sequence number."""
+        with self._cond:
+            seq = self._counters[0]
+            self._counters[0] += 1
+            self._seq[slot] = seq
+            self._state[slot] = READY
+            self._counters[1] += 1
+            ready = sum(1 for index in range(self.slots) if self._state[index] == READY)
+            self._counters[4] = max(self._counters[4], ready)
+            self._cond.notify_all()
+            return seq
+
+    def abandon(self, slot: int) -> None:
+        """Return a slot claimed with :meth:`acquire_write` that was not filled."""
+        self.release(slot)
+
+    # -- consumers ----------------------------------------------------------------
+
+    def acquire_read(self, timeout: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """Claim the oldest READY slot as ``(slot, seq)``; None when closed and drained, or on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                slot = self._oldest(READY)
+                if slot >= 0:
+                    self._state[slot] = BUSY
+                    self._counters[3] += 1
+                    return slot, self._seq[slot]
+                if self._counters[5]:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def busy_seqs(self) -> List[int]:
+        """Sequence numbers of the frames currently claimed by consumers."""
+        with self._cond:
+            return [self._seq[slot] for slot in range(self.slots) if self._state[slot] == BUSY]
+
+    def release(self, slot: int) -> None:
+        """Hand a slot back to the producer."""
+        with self._cond:
+            self._state[slot] = FREE
+            self._cond.notify_all()
+
+    # -- lifecycle ----------------------------------------------------------------
+
+    def close(self) -> None:
+        """No more frames: producers stop, consumers drain the READY slots and then get None."""
+        with self._cond:
+            self._counters[5] = 1
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._counters[5])
+
+    def unlink(self) -> None:
+        """Detach; the creating process also frees the shared block."""
+        self._views = []
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            states = list(self._state)
+            return {
+                "slots": self.slots,
+                "policy": self.policy,
+                "frames": self._counters[1],
+                "consumed": self._counters[3],
+                "dropped": self._counters[2],
+                "blocked_ms": round(self._blocked.value * 1000, 1),
+                "ready": states.count(READY),
+                "busy": states.count(BUSY),
+                "high_water": self._counters[4],
+            }
+
+    def _oldest(self, state: int) -> int:
+        best, best_seq = -1, None
+        for slot in range(self.slots):
+            if self._state[slot] == state and (best_seq is None or self._seq[slot] < best_seq):
+                best, best_seq = slot, self._seq[slot]
+        return best
+
+
+def capture_process(source, ring: SharedFrameRing, stop) -> None:
+    """Decode ``source`` into the ring until it ends or ``stop`` is set.
+
+    Reads the capture directly instead of through ``frame_source.VideoSource``:
+    decoding straight into the shared slot is the point, and this process has
+    no other work for a prefetch thread to overlap with.
+    """
+    import cv2
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole group; the parent stops us via ``stop``
+    cap = cv2.VideoCapture(source)
+    height, width = ring.shape[:2]
+    try:
+        while not stop.is_set():
+            slot = ring.acquire_write(timeout=0.5)
+            if slot is None:
+                if ring.closed:
+                    break
+                continue
+            target = ring.frame(slot)
+            success, frame = cap.read(target)
+            if not success:
+                ring.abandon(slot)
+                break
+            if frame is not target and frame.ctypes.data != target.ctypes.data:
+                # Resolution differs from the probed one: fit it into the slot
+                cv2.resize(frame, (width, height), dst=target)
+            ring.commit(slot)
+    finally:
+        cap.release()
+        ring.close()
+
+
+def inference_process(worker: int, ring: SharedFrameRing, results, stop, spec: Dict[str, object]) -> None:
+    """Load the model, then detect on ring slots and post ``(slot, seq, detections, ms)`` to ``results``.
+
+    The slot stays BUSY; whoever consumes ``results`` releases it. ``spec``
+    holds the :func:`backends.load_warm` arguments plus ``confidence`` and
+    the source's ``region`` of interest (or None).
+    """
+    import cv2
+
+    from backends import load_warm
+    from inference import predict
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    threads = int(spec.get("threads", 0))
+    try:
+        if threads > 0:
+            # Split the cores between the workers instead of every runtime grabbing all of them
+            cv2.setNumThreads(threads)
+            if spec["backend"] == "torch":
+                import torch
+
+                torch.set_num_threads(threads)
+        model, startup = load_warm(
+            spec["weights"],
+            spec["backend"],
+            spec["imgsz"],
+            spec["int8"],
+            threads=threads,
+            cache=spec.get("cache", True),
+            torchscript=spec.get("torchscript", False),
+            warmup_runs=spec.get("warmup_runs", 1),
+        )
+    except Exception as exc:  # reported by the parent
+        results.put(("error", worker, f"{type(exc).__name__}: {exc}"))
+        return
+    results.put(("ready", worker, startup))
+
+    confidence, imgsz, region = spec["confidence"], spec["imgsz"], spec.get("region")
+    try:
+        while not stop.is_set():
+            claimed = ring.acquire_read(timeout=0.5)
+            if claimed is None:
+                if ring.closed:
+                    break
+                continue
+            slot, seq = claimed
+            frame = ring.frame(slot)
+            image = region.crop(frame) if region is not None else frame
+            start = time.perf_counter()
+            detections = predict(model, image, confidence, imgsz=imgsz)[0]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if region is not None:
+                detections = region.restore(detections, frame.shape[:2])
+            results.put(("frame", worker, (slot, seq, detections, elapsed_ms)))
+    finally:
+        results.put(("done", worker, None))
+
+
+def drain(results, timeout: float) -> Optional[tuple]:
+    """``results.get`` that returns None on timeout."""
+    try:
+        return results.get(timeout=timeout)
+    except queue.Empty:
+        return None
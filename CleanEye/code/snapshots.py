@@ -0,0 +1,147 @@
+"""
+CleanEye - Auto-Save Snapshot Writer
+------------------------------------
+Background JPEG writer for ``--auto-save``. Frames are rate limited (overall
+and per tracked object) and handed to a small pool of writer threads through
+a bounded queue; when the queue is full the frame is dropped instead of
+stalling the detection loop.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from render import BufferPool
+
+
+class SnapshotWriter:
+    """Rate-limited, non-blocking JPEG writer pool.
+
+    ``max_per_second`` caps saves overall (0 = no cap). When track ids are
+    given, a frame is only saved if at least one of its tracks has not been
+    saved in the last ``track_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        quality: int = 90,
+        max_per_second: float = 2.0,
+        track_interval: float = 10.0,
+        workers: int = 2,
+        queue_size: int = 16,
+    ) -> None:
+        self.directory = directory
+        self.params = [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+        self.min_interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self.track_interval = track_interval
+        self.saved = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self._last_accepted = float("-inf")
+        self._track_saved: Dict[Tuple[str, int], float] = {}  # (source, track_id): every tracker numbers from 1
+        self._lock = threading.Lock()
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._workers: List[threading.Thread] = [
+            threading.Thread(target=self._write_loop, name=f"cleaneye-snapshot-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        directory.mkdir(parents=True, exist_ok=True)
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        frame: np.ndarray,
+        track_ids: Optional[Iterable[int]] = None,
+        prefix: str = "detection",
+        pool: Optional[BufferPool] = None,
+        source: str = "",
+    ) -> bool:
+        """Queue ``frame`` for saving; returns False when it was rate limited or dropped.
+
+        ``track_ids`` are those of ``source``'s tracker; ids of different
+        sources never throttle each other.
+
+        Without ``pool`` the frame is written as-is, so callers must not
+        modify it afterwards. With one, an accepted frame is first copied
+        into a pooled buffer (released once written), and the caller may go
+        on drawing on ``frame``.
+        """
+        now = time.monotonic()
+        fresh: List[Tuple[str, int]] = []
+        if track_ids is not None:
+            fresh = [
+                key
+                for key in ((source, int(track_id)) for track_id in track_ids)
+                if now - self._track_saved.get(key, float("-inf")) >= self.track_interval
+            ]
+            if not fresh:
+                self.rate_limited += 1
+                return False
+        if now - self._last_accepted < self.min_interval:
+            self.rate_limited += 1
+            return False
+
+        filename = self.directory / f"{prefix}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S_%f')}.jpg"
+        if pool is not None:
+            frame = pool.copy(frame)
+        try:
+            self._jobs.put_nowait((filename, frame, pool))
+        except queue.Full:
+            if pool is not None:
+                pool.release(frame)
+            self.dropped += 1
+            return False
+        self._last_accepted = now
+        for key in fresh:
+            self._track_saved[key] = now
+        if len(self._track_saved) > 4096:
+            self._track_saved = {
+                key: saved_at
+                for key, saved_at in self._track_saved.items()
+                if now - saved_at < self.track_interval
+            }
+        return True
+
+    def close(self) -> None:
+        """Write what is queued, then stop the workers."""
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "saved": self.saved,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "rate_limited": self.rate_limited,
+                "queued": self._jobs.qsize(),
+            }
+
+    def _write_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            filename, frame, pool = job
+            ok = cv2.imwrite(str(filename), frame, self.params)
+            if pool is not None:
+                pool.release(frame)
+            with self._lock:
+                if ok:
+                    self.saved += 1
+                else:
+                    self.failed += 1
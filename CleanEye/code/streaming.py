@@ -0,0 +1,218 @@
+"""
+CleanEye - MJPEG Viewer Server
+------------------------------
+Serves annotated frames to browsers as ``multipart/x-mixed-replace`` MJPEG.
+The detector only swaps in a reference to the newest frame; one encoder
+thread JPEG-encodes it once (and only while someone is watching) and every
+viewer thread sends the latest encoded frame. A slow viewer simply skips
+frames, so nothing queues per client and viewers never slow the detector.
+
+    /                 index page with every channel
+    /stream/<name>    MJPEG stream (``/stream`` = first channel)
+    /snapshot/<name>  single JPEG
+"""
+
+from __future__ import annotations
+
+import html
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import quote, unquote
+
+import cv2
+import numpy as np
+
+BOUNDARY = "cleaneyeframe"
+
+
+@dataclass
+class _Channel:
+    raw: Optional[np.ndarray] = None
+    pending: bool = False
+    jpeg: Optional[bytes] = None
+    encoded_from: Optional[np.ndarray] = None
+    seq: int = 0
+    viewers: int = 0
+
+
+class MjpegServer:
+    """Fan the latest frame of each channel out to any number of HTTP viewers."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8090, quality: int = 80) -> None:
+        self.quality = int(quality)
+        self.channels: Dict[str, _Channel] = {}
+        self.published = 0
+        self.encoded = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self.server.serve_forever, name="cleaneye-mjpeg-http", daemon=True),
+            threading.Thread(target=self._encode_loop, name="cleaneye-mjpeg-encoder", daemon=True),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{'localhost' if host == '0.0.0.0' else host}:{port}/"
+
+    def start(self) -> "MjpegServer":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def publish(self, name: str, frame: np.ndarray) -> None:
+        """Make ``frame`` the newest frame of channel ``name`` (O(1), never encodes)."""
+        with self._cond:
+            channel = self.channels.get(name)
+            if channel is None:
+                channel = self.channels[name] = _Channel()
+            channel.raw = frame
+            channel.pending = True
+            self.published += 1
+            if channel.viewers:
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "published": self.published,
+                "encoded": self.encoded,
+                "viewers": sum(channel.viewers for channel in self.channels.values()),
+            }
+
+    def _next_job(self):
+        for channel in self.channels.values():
+            if channel.pending and channel.viewers:
+                channel.pending = False
+                return channel, channel.raw
+        return None
+
+    def _encode_loop(self) -> None:
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._stopped:
+                    self._cond.wait()
+                    job = self._next_job()
+                if self._stopped:
+                    return
+            channel, frame = job
+            ok, buffer = cv2.imencode(".jpg", frame, params)
+            if not ok:
+                continue
+            with self._cond:
+                channel.jpeg = buffer.tobytes()
+                channel.encoded_from = frame
+                channel.seq += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def _wait_frame(self, channel: _Channel, seen: int, timeout: float = 5.0) -> Optional[tuple]:
+        """Block until ``channel`` has a frame newer than ``seq`` ``seen``; None on stop or timeout."""
+        with self._cond:
+            if not seen:  # a new viewer gets the newest frame, encoded now if it is not yet
+                if channel.encoded_from is channel.raw:
+                    return channel.seq, channel.jpeg
+                channel.pending = True
+                seen = channel.seq
+                self._cond.notify_all()
+            if not self._cond.wait_for(lambda: self._stopped or channel.seq > seen, timeout):
+                return None
+            if self._stopped:
+                return None
+            return channel.seq, channel.jpeg
+
+    def _channel(self, name: str) -> Optional[_Channel]:
+        with self._cond:
+            if not name:
+                return next(iter(self.channels.values()), None)
+            return self.channels.get(name)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                path = unquote(self.path.split("?", 1)[0]).rstrip("/")
+                if path == "":
+                    self._index()
+                elif path == "/stream" or path.startswith("/stream/"):
+                    self._stream(path[len("/stream/"):] if path.startswith("/stream/") else "", snapshot=False)
+                elif path == "/snapshot" or path.startswith("/snapshot/"):
+                    self._stream(path[len("/snapshot/"):] if path.startswith("/snapshot/") else "", snapshot=True)
+                else:
+                    self.send_error(404)
+
+            def _index(self) -> None:
+                with server._cond:
+                    names = list(server.channels)
+                items = "".join(
+                    f'<h3>{html.escape(name)}</h3><img src="/stream/{quote(name)}" style="max-width:100%">'
+                    for name in names
+                ) or "<p>No frames published yet - reload in a moment.</p>"
+                body = f"<html><head><title>CleanEye Live</title></head><body>{items}</body></html>".encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, name: str, snapshot: bool) -> None:
+                channel = server._channel(name)
+                if channel is None:
+                    self.send_error(404, "Unknown or idle channel")
+                    return
+                with server._cond:
+                    channel.viewers += 1
+                try:
+                    seen = 0
+                    if snapshot:
+                        frame = server._wait_frame(channel, seen)
+                        if frame is None:
+                            self.send_error(503)
+                            return
+                        self.send_response(200)
+                        self.send_header("Content-Type", "image/jpeg")
+                        self.send_header("Content-Length", str(len(frame[1])))
+                        self.end_headers()
+                        self.wfile.write(frame[1])
+                        return
+
+                    self.send_response(200)
+                    self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                    self.send_header("Cache-Control", "no-cache, private")
+                    self.end_headers()
+                    while True:
+                        frame = server._wait_frame(channel, seen)
+                        if frame is None:
+                            if server._stopped:
+                                return
+                            continue
+                        seen, jpeg = frame
+                        self.wfile.write(
+                            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                        )
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # viewer went away
+                finally:
+                    with server._cond:
+                        channel.viewers -= 1
+
+            def log_message(self, format: str, *args) -> None:  # silence per-request logging
+                return
+
+        return Handler
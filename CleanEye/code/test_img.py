@@ -8,30 +8,24 @@ from __future__ import annotations
 import argparse
 import cv2
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from ultralytics import YOLO
+from backends import describe_startup, load_warm
+from inference import detect, draw_detections
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_WEIGHTS = ROOT_DIR / "Weights" / "best.pt"
 MEDIA_DIR = ROOT_DIR / "media"
 OUTPUT_DIR = ROOT_DIR / "outputs"
 
-# Simple color mapping - use raw model labels directly
-COLORS = {
-    "0": (0, 165, 255),           # Orange
-    "c": (255, 215, 0),            # Gold
-    "garbage": (0, 0, 255),        # Red
-    "garbage_bag": (255, 0, 255),  # Magenta
-    "waste": (0, 255, 0),          # Green
-    "trash": (255, 140, 0),        # Dark Orange
-}
-
 
 def load_model(weights: Path) -> YOLO:
     print(f"[INFO] Loading model from {weights} ...")
-    model = YOLO(str(weights))
-    print("[INFO] Model ready.")
+    model, startup = load_warm(weights)
+    print(f"[INFO] Model ready: {describe_startup(startup)}.")
     return model
 
 
@@ -40,28 +34,9 @@ def annotate(model: YOLO, image_path: Path, confidence: float) -> int:
     if image is None:
         raise RuntimeError(f"Unable to open image: {image_path}")
 
-    results = model(image, conf=confidence, verbose=False)
-    boxes = results[0].boxes
-    detections = 0
-
-    for box in boxes:
-        cls_id = int(box.cls[0])
-        raw_label = model.names[cls_id]
-        color = COLORS.get(raw_label, (255, 255, 255))
-        conf = float(box.conf[0])
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
-        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
-        cv2.putText(
-            image,
-            f"{raw_label} {conf:.0%}",
-            (x1, max(25, y1 - 10)),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            color,
-            2,
-            cv2.LINE_AA,
-        )
-        detections += 1
+    found = detect(model, image, confidence)
+    draw_detections(image, found)
+    detections = len(found)
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     output_path = OUTPUT_DIR / f"detection_{image_path.name}"
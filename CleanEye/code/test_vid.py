@@ -3,25 +3,23 @@ CleanEye - Video Tester
 Test garbage detection on video files
 """
 import cv2
-from ultralytics import YOLO
 import os
+from pathlib import Path
 
-# Simple color mapping - use raw model labels directly
-COLORS = {
-    "0": (0, 165, 255),           # Orange
-    "c": (255, 215, 0),            # Gold
-    "garbage": (0, 0, 255),        # Red
-    "garbage_bag": (255, 0, 255),  # Magenta
-    "waste": (0, 255, 0),          # Green
-    "trash": (255, 140, 0),        # Dark Orange
-}
-def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
+from backends import describe_startup, load_warm
+from inference import detect, draw_detections
+from frame_source import VideoSource
+from sampling import DEFAULT_SAMPLE_RATE
+
+
+def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25, sample_rate=DEFAULT_SAMPLE_RATE):
     """
     Test garbage detection on a video file
     
     Args:
         video_path: Path to video file
         confidence_threshold: Minimum confidence for detection
+        sample_rate: Frames analyzed per second of video in fast mode
     """
     
     # Check if video exists
@@ -36,21 +34,22 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
     
     # Load YOLO model with custom weights
     print("🔄 Loading model from Weights/best.pt...")
-    model = YOLO("Weights/best.pt")
-    print("✅ Model loaded successfully!\n")
+    model, startup = load_warm(Path("Weights/best.pt"))
+    print(f"✅ Model {describe_startup(startup)}!\n")
     
-    # Initialize video capture
-    cap = cv2.VideoCapture(video_path)
+    # Initialize video reader (decodes the next frames while the current one is processed)
+    # Every frame by default; fast mode samples by video time
+    source = VideoSource(video_path, sample_rate=0)
     
-    if not cap.isOpened():
+    if not source.opened:
+        source.release()
         print(f"❌ Error: Could not open video {video_path}")
         return False
     
     # Get video properties
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = int(source.fps)
+    total_frames = source.frame_count
+    width, height = source.resolution
     
     print(f"🎥 Video loaded: {os.path.basename(video_path)}")
     print(f"📐 Resolution: {width}x{height}")
@@ -63,60 +62,35 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
     print("  - Press 's' to save frame")
     print("  - Press '+' to speed up (up to 4x)")
     print("  - Press '-' to slow down (down to 0.5x)")
-    print("  - Press 'f' to toggle fast mode (skip frames)\n")
+    print(f"  - Press 'f' to toggle fast mode ({sample_rate:g} frames per second of video)\n")
     
     frame_count = 0
     total_detections = 0
     paused = False
-    skip_frames = 1  # Process every frame by default (1 = no skip)
+    sampler = source.sampler
     playback_speed = 1.0  # 1.0 = normal speed
     
     while True:
         if not paused:
-            success, img = cap.read()
+            sample = source.next()
             
-            if not success:
+            if sample is None:
                 print("\n✅ Video ended!")
                 break
             
+            frame_index, _, img = sample
             frame_count += 1
             
-            # Skip frames for faster processing
-            if frame_count % skip_frames != 0:
-                continue
-            
             # Run detection
-            results = model(img, conf=confidence_threshold, verbose=False)
-            
-            detection_in_frame = 0
+            detections = detect(model, img, confidence_threshold)
+            detection_in_frame = len(detections)
+            total_detections += detection_in_frame
             
-            # Process each detection
-            for box in results[0].boxes:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                raw_label = model.names[cls_id]
-                color = COLORS.get(raw_label, (255, 255, 255))
-                
-                if conf >= confidence_threshold:
-                    detection_in_frame += 1
-                    total_detections += 1
-                    
-                    # Draw bounding box (consistent with other scripts)
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
-                    cv2.putText(
-                        img,
-                        f"{raw_label} {conf:.0%}",
-                        (x1, max(25, y1 - 10)),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.7,
-                        color,
-                        2,
-                        cv2.LINE_AA,
-                    )
+            # Draw bounding boxes (consistent with other scripts)
+            draw_detections(img, detections)
             
             # Add frame info overlay
-            info_text = f"Frame: {frame_count}/{total_frames} | Detections: {detection_in_frame}"
+            info_text = f"Frame: {frame_index + 1}/{total_frames} | Detections: {detection_in_frame}"
             cv2.putText(img, info_text, (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
@@ -124,7 +98,7 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
         cv2.imshow("CleanEye - Video Detection", img)
         
         # Handle key presses with adjustable playback speed
-        # Calculate delay based on FPS and playback speed
+        # Calculate delay based on FPS and playback speed (fast mode shows one frame per stride)
         delay = max(1, int((1000 / fps) / playback_speed)) if fps > 0 else 1
         key = cv2.waitKey(delay) & 0xFF
         
@@ -139,7 +113,7 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
                 print("▶️  Resumed")
         elif key == ord('s'):
             # Save current frame
-            output_path = f"outputs/video_frame_{frame_count}.jpg"
+            output_path = f"outputs/video_frame_{frame_index + 1}.jpg"
             os.makedirs("outputs", exist_ok=True)
             cv2.imwrite(output_path, img)
             print(f"💾 Saved: {output_path}")
@@ -149,13 +123,13 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
         elif key == ord('-'):  # Slow down
             playback_speed = max(0.5, playback_speed - 0.5)
             print(f"🐢 Speed: {playback_speed}x")
-        elif key == ord('f'):  # Toggle frame skip
-            skip_frames = 2 if skip_frames == 1 else 1
-            mode = "FAST (skip frames)" if skip_frames == 2 else "NORMAL (all frames)"
+        elif key == ord('f'):  # Toggle time-based sampling
+            sampler.rate = 0 if sampler.rate else sample_rate
+            mode = f"FAST (every {sampler.stride} frames)" if sampler.rate else "NORMAL (all frames)"
             print(f"🎬 Mode: {mode}")
     
     # Cleanup
-    cap.release()
+    source.release()
     cv2.destroyAllWindows()
     cv2.waitKey(1)
     
@@ -164,8 +138,9 @@ def test_video(video_path="media/garbage.mp4", confidence_threshold=0.25):
     print("📊 Video Detection Summary")
     print("=" * 70)
     print(f"✅ Frames processed: {frame_count}/{total_frames}")
+    print(f"⏱️  Video covered: {source.seconds:.1f}s ({sampler.grabbed} frames skipped with grab, {sampler.seeks} seeks)")
     print(f"🗑️  Total detections: {total_detections}")
-    print(f"📈 Avg detections/frame: {total_detections/frame_count:.2f}")
+    print(f"📈 Avg detections/frame: {total_detections/max(frame_count, 1):.2f}")
     print("=" * 70)
     
     return True
@@ -0,0 +1,225 @@
+"""
+CleanEye - Multi-Object Tracking
+--------------------------------
+SORT-style tracker (constant-velocity Kalman filter + IoU association) that
+runs on the CPU with NumPy only. Each physical object keeps one track ID
+while it stays in view, so the logger can record objects instead of
+boxes-per-frame, and the model can skip frames while tracks are predicted.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from inference import Detections
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - greedy matching fallback
+    linear_sum_assignment = None
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) ``xyxy`` boxes."""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    a = boxes_a[:, None, :].astype(np.float32)
+    b = boxes_b[None, :, :].astype(np.float32)
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def _match(iou: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    if iou.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+        pairs = zip(rows.tolist(), cols.tolist())
+    else:
+        order = np.dstack(np.unravel_index(np.argsort(-iou, axis=None), iou.shape))[0]
+        used_rows, used_cols, greedy = set(), set(), []
+        for row, col in order.tolist():
+            if row not in used_rows and col not in used_cols:
+                used_rows.add(row)
+                used_cols.add(col)
+                greedy.append((row, col))
+        pairs = greedy
+    return [(row, col) for row, col in pairs if iou[row, col] >= threshold]
+
+
+def _box_to_z(box: np.ndarray) -> np.ndarray:
+    width, height = box[2] - box[0], box[3] - box[1]
+    return np.array([box[0] + width / 2, box[1] + height / 2, width * height, width / max(height, 1e-6)], dtype=np.float64)
+
+
+def _x_to_box(state: np.ndarray) -> np.ndarray:
+    area, ratio = max(state[2], 1e-6), max(state[3], 1e-6)
+    width = np.sqrt(area * ratio)
+    height = area / max(width, 1e-6)
+    return np.array([state[0] - width / 2, state[1] - height / 2, state[0] + width / 2, state[1] + height / 2])
+
+
+class KalmanBoxFilter:
+    """Constant-velocity Kalman filter over (cx, cy, area, aspect ratio)."""
+
+    _F = np.eye(7)
+    _F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+    _H = np.eye(4, 7)
+
+    def __init__(self, box: np.ndarray) -> None:
+        self.x = np.zeros(7)
+        self.x[:4] = _box_to_z(box)
+        self.P = np.eye(7) * 10.0
+        self.P[4:, 4:] *= 1000.0
+        self.Q = np.eye(7)
+        self.Q[4:, 4:] *= 0.01
+        self.Q[-1, -1] *= 0.01
+        self.R = np.eye(4)
+        self.R[2:, 2:] *= 10.0
+
+    def predict(self) -> np.ndarray:
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self._F @ self.x
+        self.P = self._F @ self.P @ self._F.T + self.Q
+        return _x_to_box(self.x)
+
+    def update(self, box: np.ndarray) -> None:
+        residual = _box_to_z(box) - self._H @ self.x
+        innovation = self._H @ self.P @ self._H.T + self.R
+        gain = self.P @ self._H.T @ np.linalg.inv(innovation)
+        self.x = self.x + gain @ residual
+        self.P = (np.eye(7) - gain @ self._H) @ self.P
+
+    @property
+    def box(self) -> np.ndarray:
+        return _x_to_box(self.x)
+
+
+@dataclass
+class Track:
+    track_id: int
+    class_id: int
+    label: str
+    source: str
+    first_frame: int
+    confidence: float
+    max_confidence: float
+    last_frame: int = 0
+    hits: int = 1
+    misses: int = 0
+    reported: bool = False
+    kalman: KalmanBoxFilter = field(repr=False, default=None)  # type: ignore[assignment]
+
+
+@dataclass
+class TrackUpdate:
+    """Result of one tracker step: boxes to draw plus tracks that started or ended."""
+
+    active: Detections
+    started: List[Track]
+    ended: List[Track]
+
+
+class SortTracker:
+    """Assign persistent IDs to detections across frames.
+
+    ``update`` consumes fresh model detections; ``predict`` advances every
+    track one frame without a detection (for frames the model skipped).
+    Tracks are confirmed after ``min_hits`` matches and end after
+    ``max_age`` consecutive inference rounds without a match.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 5, min_hits: int = 3) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.tracks: List[Track] = []
+        self.updates = 0
+        self._ids = itertools.count(1)
+        self._names: Dict[int, str] = {}
+
+    def active(self) -> Detections:
+        """Confirmed tracks matched in the latest update, as drawable detections."""
+        shown = [track for track in self.tracks if track.reported and track.misses == 0]
+        if not shown:
+            return Detections.empty(self._names)
+        return Detections(
+            xyxy=np.array([track.kalman.box for track in shown], dtype=np.int32),
+            confidence=np.array([track.confidence for track in shown], dtype=np.float32),
+            class_ids=np.array([track.class_id for track in shown], dtype=np.int32),
+            names=self._names,
+            track_ids=np.array([track.track_id for track in shown], dtype=np.int32),
+        )
+
+    def predict(self) -> Detections:
+        """Advance all tracks one frame and return the confirmed boxes."""
+        for track in self.tracks:
+            track.kalman.predict()
+        return self.active()
+
+    def update(self, detections: Detections, frame_index: int, source: str) -> TrackUpdate:
+        self.updates += 1
+        self._names = detections.names or self._names
+        predicted = np.array([track.kalman.predict() for track in self.tracks]).reshape(-1, 4)
+        iou = iou_matrix(predicted, detections.xyxy)
+        same_class = detections.class_ids[None, :] == np.array([t.class_id for t in self.tracks], dtype=np.int32)[:, None]
+        matches = _match(np.where(same_class, iou, 0.0), self.iou_threshold)
+
+        matched_tracks = {row for row, _ in matches}
+        matched_dets = {col for _, col in matches}
+        for row, col in matches:
+            track = self.tracks[row]
+            track.kalman.update(detections.xyxy[col].astype(np.float64))
+            track.confidence = float(detections.confidence[col])
+            track.max_confidence = max(track.max_confidence, track.confidence)
+            track.last_frame = frame_index
+            track.hits += 1
+            track.misses = 0
+        for row, track in enumerate(self.tracks):
+            if row not in matched_tracks:
+                track.misses += 1
+
+        labels = detections.labels
+        for col in range(len(detections)):
+            if col in matched_dets:
+                continue
+            box = detections.xyxy[col].astype(np.float64)
+            conf = float(detections.confidence[col])
+            self.tracks.append(
+                Track(
+                    track_id=next(self._ids),
+                    class_id=int(detections.class_ids[col]),
+                    label=labels[col],
+                    source=source,
+                    first_frame=frame_index,
+                    last_frame=frame_index,
+                    confidence=conf,
+                    max_confidence=conf,
+                    kalman=KalmanBoxFilter(box),
+                )
+            )
+
+        started = []
+        for track in self.tracks:
+            if not track.reported and track.misses == 0 and (track.hits >= self.min_hits or self.updates <= self.min_hits):
+                track.reported = True
+                started.append(track)
+
+        ended = [track for track in self.tracks if track.misses > self.max_age]
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_age]
+        return TrackUpdate(active=self.active(), started=started, ended=[t for t in ended if t.reported])
+
+    def finish(self) -> List[Track]:
+        """End every confirmed track (call when the stream closes)."""
+        ended = [track for track in self.tracks if track.reported]
+        self.tracks = []
+        return ended
@@ -11,9 +11,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
-import torch
-from ultralytics import YOLO
-
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_CONFIG = ROOT_DIR / "data" / "data.yaml"
 OUTPUT_DIR = ROOT_DIR / "outputs"
@@ -40,6 +37,8 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
 def resolve_device(device_arg: str | None) -> str:
     if device_arg:
         return device_arg
+    import torch
+
     if torch.cuda.is_available():
         return "0"
     print("[WARN] CUDA not available; falling back to CPU. Training will be slower.")
@@ -59,6 +58,8 @@ def train_model(args: argparse.Namespace) -> Dict[str, Any]:
     print(f"Image size  : {args.imgsz}")
     print("=" * 60)
 
+    from ultralytics import YOLO
+
     model = YOLO(args.weights)
 
     results = model.train(
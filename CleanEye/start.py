@@ -1,20 +1,60 @@
 """
 CleanEye launcher.
 Use this menu to start the Streamlit demo, run YOLO detectors, or access tools.
+
+The detector and testers run inside this interpreter, so OpenCV and
+Ultralytics are imported once - in the background while the menu is shown -
+instead of by a fresh interpreter per menu action. Set
+CLEANEYE_LAUNCHER_SUBPROCESS=1 to run every tool in its own process again.
 """
 
 from __future__ import annotations
 
 import os
+import runpy
 import socket
 import subprocess
 import sys
+import threading
 from pathlib import Path
 from typing import Callable, Dict, Tuple
 
 ROOT_DIR = Path(__file__).resolve().parent
 CODE_DIR = ROOT_DIR / "code"
 PYTHON = sys.executable
+IN_PROCESS = os.environ.get("CLEANEYE_LAUNCHER_SUBPROCESS") != "1"
+PRELOAD_MODULES = ("cv2", "numpy", "ultralytics")
+
+
+def preload() -> None:
+    """Import the detector's heavy dependencies while the user reads the menu."""
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except Exception:  # the tool reports missing dependencies itself
+            pass
+
+
+def run_tool(script: str, *args: str) -> None:
+    """Run a ``code/`` script as ``__main__``, in-process unless disabled."""
+    if not IN_PROCESS:
+        subprocess.run([PYTHON, str(CODE_DIR / script), *args], check=False)
+        return
+    saved_argv = sys.argv
+    sys.argv = [str(CODE_DIR / script), *args]
+    if str(CODE_DIR) not in sys.path:
+        sys.path.insert(0, str(CODE_DIR))
+    try:
+        runpy.run_path(str(CODE_DIR / script), run_name="__main__")
+    except SystemExit as exc:
+        if exc.code not in (None, 0) and not isinstance(exc.code, int):
+            print(exc.code, file=sys.stderr)  # what the interpreter would have printed on exit
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopped by user.")
+    except Exception as exc:
+        print(f"[ERROR] {script} failed: {exc}")
+    finally:
+        sys.argv = saved_argv
 
 
 def get_local_ip() -> str:
@@ -56,28 +96,25 @@ def run_streamlit() -> None:
 
 
 def run_detector() -> None:
-    cmd = [PYTHON, str(CODE_DIR / "detect_pro.py")]
-    subprocess.run(cmd, check=False)
+    run_tool("detect_pro.py")
 
 
 def run_image_tester() -> None:
-    cmd = [PYTHON, str(CODE_DIR / "test_img.py")]
-    subprocess.run(cmd, check=False)
+    run_tool("test_img.py")
 
 
 def run_video_tester() -> None:
-    cmd = [PYTHON, str(CODE_DIR / "test_vid.py")]
-    subprocess.run(cmd, check=False)
+    run_tool("test_vid.py")
 
 
 def run_training() -> None:
+    # Training keeps its own process: dataloader workers and CUDA state should not outlive it here
     cmd = [PYTHON, str(CODE_DIR / "train.py")]
     subprocess.run(cmd, check=False)
 
 
 def run_qr_generator() -> None:
-    cmd = [PYTHON, str(CODE_DIR / "generate_qr.py")]
-    subprocess.run(cmd, check=False)
+    run_tool("generate_qr.py")
 
 
 def open_outputs() -> None:
@@ -113,6 +150,8 @@ def print_menu() -> None:
 
 
 def main() -> None:
+    if IN_PROCESS:
+        threading.Thread(target=preload, name="cleaneye-preload", daemon=True).start()
     while True:
         print_menu()
         choice = input("Select an option: ").strip().lower()